@@ -0,0 +1,73 @@
+"""benchmarks/route_tree.py
+
+Measures how long hug.route_tree.RouteTree takes to build and match against 1k and 10k routes, compared to a flat
+table of URL patterns tried one after another (how per-route frameworks routers typically resolve requests)
+
+Usage: python benchmarks/route_tree.py
+"""
+import random
+import re
+import timeit
+
+from hug.route_tree import RouteTree
+
+VERSIONS = (1, 2, 3, 4, 5, 6)
+
+
+def urls(count):
+    """Returns count URLs spread over resources, half of which capture a typed parameter"""
+    for index in range(count):
+        resource = 'resource{0}'.format(index // 4)
+        yield ('/{0}/action{1}'.format(resource, index % 4) if index % 2 else
+               '/{0}/<item_id:int>/action{1}'.format(resource, index % 4))
+
+
+def flat_table(route_urls):
+    table = []
+    for url in route_urls:
+        pattern = re.sub(r'<(\w+):int>', lambda match: r'(?P<{0}>-?\d+)'.format(match.group(1)), url)
+        for version in VERSIONS:
+            table.append((re.compile('^/v{0}{1}$'.format(version, pattern)), version, url))
+        table.append((re.compile('^{0}$'.format(pattern)), None, url))
+    return table
+
+
+def flat_match(table, path):
+    for pattern, version, url in table:
+        match = pattern.match(path)
+        if match:
+            return url, version, match.groupdict()
+
+
+def build_tree(route_urls):
+    tree = RouteTree(VERSIONS)
+    for url in route_urls:
+        tree.add(url, 'GET', None, url)
+    return tree
+
+
+def run(count, requests=2000):
+    route_urls = list(urls(count))
+    paths = []
+    for url in random.sample(route_urls, min(requests, len(route_urls))):
+        path = url.replace('<item_id:int>', str(random.randint(0, 10000)))
+        paths.append('/v{0}{1}'.format(random.choice(VERSIONS), path) if random.random() < 0.5 else path)
+
+    build = timeit.timeit(lambda: build_tree(route_urls), number=1)
+    tree = build_tree(route_urls)
+    tree_match = timeit.timeit(lambda: [tree.resolve('GET', path) for path in paths], number=1) / len(paths)
+
+    flat_build = timeit.timeit(lambda: flat_table(route_urls), number=1)
+    table = flat_table(route_urls)
+    sample = paths[:max(len(paths) // 20, 1)]
+    flat = timeit.timeit(lambda: [flat_match(table, path) for path in sample], number=1) / len(sample)
+
+    print('{0:>6} routes x {1} versions'.format(count, len(VERSIONS)))
+    print('    route tree: built in {0:8.2f}ms, {1:8.2f}us per match'.format(build * 1000, tree_match * 1000000))
+    print('    flat table: built in {0:8.2f}ms, {1:8.2f}us per match'.format(flat_build * 1000, flat * 1000000))
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    for route_count in (1000, 10000):
+        run(route_count)
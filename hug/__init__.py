@@ -31,8 +31,9 @@ OTHER DEALINGS IN THE SOFTWARE.
 """
 from __future__ import absolute_import
 
-from hug import (authentication, directives, exceptions, format, input_format, introspect,
-                 middleware, output_format, redirect, route, transform, types, use, validate)
+from hug import (authentication, cache, compression, conditional, directives, exceptions, format, input_format,
+                 introspect, middleware, output_format, ranges, redirect, route, route_tree, tokens, transform, types,
+                 use, validate)
 from hug._version import current
 from hug.api import API
 from hug.decorators import (default_input_format, default_output_format, directive, extend_api, middleware_class,
@@ -27,6 +27,7 @@ import sys
 from collections import OrderedDict, namedtuple
 from functools import partial
 from itertools import chain
+import re
 from types import ModuleType
 import sanic
 # from sanic_session import session_middleware
@@ -39,10 +40,14 @@ from sanic import Sanic
 from settings import config
 
 from hug.middleware import not_found_middleware
+from hug.settings import HTTP_METHODS
 import hug.defaults
 import hug.output_format
+import hug.route_tree
 from hug._version import current
 
+VERSION_PREFIX = re.compile(r'^/v(\d+)(?=/|$)')
+
 INTRO = """
 /##########################################################################\\
           `.----``..-------..``.----.
@@ -78,10 +83,42 @@ class InterfaceAPI(object):
         self.api = api
 
 
+class ExceptionHandlers(object):
+    """The exception handlers registered for a single API version, precomputed for fast lookup
+
+       Which handler an exception class resolves to is found once, then remembered per class. A handler registered
+       for the exact class wins, followed by the earliest registered handler for any of its base classes.
+    """
+    __slots__ = ('types', 'handlers', 'exact', 'resolved')
+
+    def __init__(self, handlers):
+        self.handlers = tuple(handlers.items())
+        self.types = tuple(handlers.keys())
+        self.exact = dict(self.handlers)
+        self.resolved = {}
+
+    def handler(self, exception_type):
+        """Returns the handler that should be used for exceptions of the given class, or None if there are none"""
+        try:
+            return self.resolved[exception_type]
+        except KeyError:
+            pass
+
+        handler = self.exact.get(exception_type)
+        if handler is None:
+            for handled_type, exception_handler in self.handlers:
+                if issubclass(exception_type, handled_type):
+                    handler = exception_handler
+                    break
+        self.resolved[exception_type] = handler
+        return handler
+
+
 class HTTPInterfaceAPI(InterfaceAPI):
     """Defines the HTTP interface specific API"""
     __slots__ = ('routes', 'versions', 'base_url', '_output_format', '_input_format', 'versioned', '_middleware',
-                 '_not_found_handlers', '_startup_handlers', 'sinks', '_not_found', '_exception_handlers')
+                 '_not_found_handlers', '_startup_handlers', 'sinks', '_not_found', '_exception_handlers',
+                 '_compression', '_exception_lookups')
 
     def __init__(self, api, base_url=''):
         super().__init__(api)
@@ -92,6 +129,15 @@ class HTTPInterfaceAPI(InterfaceAPI):
         self.base_url = base_url
         self._middleware = set([not_found_middleware])
 
+    @property
+    def compression(self):
+        """The hug.compression.Compression applied to the responses of routes that don't define their own"""
+        return getattr(self, '_compression', None)
+
+    @compression.setter
+    def compression(self, compression):
+        self._compression = compression
+
     @property
     def output_format(self):
         return getattr(self, '_output_format', hug.defaults.output_format)
@@ -144,6 +190,19 @@ class HTTPInterfaceAPI(InterfaceAPI):
             self._exception_handlers = {}
         for version in versions:
             self._exception_handlers.setdefault(version, OrderedDict())[exception_type] = error_handler
+        self._exception_lookups = {}
+
+    def exception_lookup(self, version=None):
+        """Returns the ExceptionHandlers resolving exceptions raised by endpoints of the given API version"""
+        lookups = getattr(self, '_exception_lookups', None)
+        if lookups is None:
+            lookups = self._exception_lookups = {}
+        if version not in getattr(self, '_exception_handlers', ()):
+            version = None
+        lookup = lookups.get(version)
+        if lookup is None:
+            lookup = lookups[version] = ExceptionHandlers(self.exception_handlers(version) or {})
+        return lookup
 
     def extend(self, http_api, route="", base_url=""):
 
@@ -236,13 +295,13 @@ class HTTPInterfaceAPI(InterfaceAPI):
         documentation['handlers'] = version_dict
         return documentation
 
-    def serve(self, port=8005, no_documentation=False):
+    def serve(self, port=8005, no_documentation=False, compiled=False):
         """Runs the basic hug development server against this API"""
 
         if no_documentation:
-            app = self.aio_server(None)
+            app = self.aio_server(None, compiled=compiled)
         else:
-            app = self.aio_server()
+            app = self.aio_server(compiled=compiled)
 
         app.run(host=config['HOST'],
                 port=config['PORT'],
@@ -257,32 +316,54 @@ class HTTPInterfaceAPI(InterfaceAPI):
         """Defines the base 404 handler"""
         response.set_status(404)
 
+    def path_version(self, path):
+        """Returns the API version selected by a leading `/vN` segment of the path, if N is a known version"""
+        if self.base_url and path.startswith(self.base_url):
+            path = path[len(self.base_url):]
+        match = VERSION_PREFIX.match(path)
+        if match:
+            version = int(match.group(1))
+            if version in self.versions:
+                return version
+        return None
+
     def determine_version(self, request, api_version=None):
-        """Determines the appropriate version given the set api_version, the request header, and URL query params"""
+        """Determines the appropriate version given the set api_version, the request header, and URL query params
+
+           Passing False as the api_version parses it from the `/vN` prefix of the request path instead.
+           Versions requested by the client that aren't integers, or that conflict, raise HTTPBadRequest; unless the
+           API declares no versions, in which case whatever the client asks for is ignored.
+        """
         if api_version is False:
-            api_version = None
-            for version in self.versions:
-                if version and "v{0}".format(version) in request.path:
-                    api_version = version
-                    break
+            api_version = self.path_version(request.path)
 
         request_version = set()
         if api_version is not None:
-            request_version.add(api_version)
+            request_version.add(int(api_version))
 
-        # version_header = request.get_header("X-API-VERSION")
-        # if version_header:
-        #     request_version.add(version_header)
+        if not any(version is not None for version in self.versions):
+            return next(iter(request_version or (None,)))
 
-        # version_param = request.get_param('api_version')
-        # if version_param is not None:
-        #     request_version.add(version_param)
+        version_header = request.headers.get('X-API-VERSION')
+        if version_header:
+            request_version.add(self._requested_version(version_header))
+
+        version_param = request.GET.get('api_version')
+        if version_param is not None:
+            request_version.add(self._requested_version(version_param))
 
         if len(request_version) > 1:
-            raise ValueError('You are requesting conflicting versions')
+            raise sanic.web.HTTPBadRequest(text='You are requesting conflicting versions')
 
         return next(iter(request_version or (None,)))
 
+    @staticmethod
+    def _requested_version(version):
+        try:
+            return int(version)
+        except ValueError:
+            raise sanic.web.HTTPBadRequest(text='Invalid API version requested: {0}'.format(version))
+
     def documentation_404(self, base_url=None):
         """Returns a smart 404 page that contains documentation for the written API"""
         base_url = self.base_url if base_url is None else base_url
@@ -304,76 +385,48 @@ class HTTPInterfaceAPI(InterfaceAPI):
 
         return handle_404
 
-    def version_router(self, request, response, api_version=None, versions={}, not_found=None, **kwargs):
-        """Intelligently routes a request to the correct handler based on the version being requested"""
-        request_version = self.determine_version(request, api_version)
-        if request_version:
-            request_version = int(request_version)
-        versions.get(request_version or False, versions.get(None, not_found))(request, response,
-                                                                              api_version=api_version,
-                                                                              **kwargs)
-
-    def aio_server(self, default_not_found=True):
+    def version_router(self, versions, not_found=None):
+        """Returns a single request handler that routes to the correct interface based on the version being requested
+
+           versions maps each API version to the interface serving it. Which interface serves each of the API's versions
+           is decided once, up front, so routing a request is a single lookup once its version is known. Versions the
+           API doesn't know fall back to the unversioned interface, if there is one.
+        """
+        default = versions.get(None)
+        fallback = default or next(iter(versions.values()))
+        table = {version: versions.get(version, fallback) for version in self.versions if version is not None}
+
+        async def route(request, api_version=None, **kwargs):
+            version = self.determine_version(request, api_version)
+            handler = default if version is None else table.get(version, default)
+            if handler is None:
+                if not_found is None:
+                    raise sanic.web.HTTPNotFound()
+                return await not_found(request)
+            return await handler(request, api_version=version, **kwargs)
+        return route
+
+    def aio_server(self, default_not_found=True, compiled=False, route_tree=False):
+        """Returns a Sanic application exposing this API.
+
+           When compiled is True every endpoint is registered as a coroutine specialised to the features it uses,
+           instead of the generic interface that decides what to do on every request.
+           When route_tree is True, a single catch-all route dispatching through a hug.route_tree.RouteTree is
+           registered, instead of one Sanic route per URL, method, and version.
+        """
         if config['DEBUG']:
             logging.basicConfig(level=logging.DEBUG)
 
         app = Sanic("hug", log_config=config['logging'])
 
-        routesdoc = {}
-        for router_base_url, routes in self.routes.items():
-            for url, methods in routes.items():
-                for method, versions in methods.items():
-                    routers = {}
-                    method_function = "on_{0}".format(method.lower())
-                    routers[method_function] = {}
-                    if len(versions) == 1 and None in versions.keys():
-                        routers[method_function][None] = versions[None]
-                    else:
-                        for ver in versions.keys():
-                            routers[method_function][ver] = versions[ver]
-
-                    for method_function in routers.keys():
-                        if routers[method_function].get(None):
-                            app.add_route(handler=routers[method_function][None], uri=router_base_url + url,
-                                          methods=[method])
-                            if router_base_url + url not in routesdoc:
-                                routesdoc[router_base_url + url] = {
-                                    method: routers[method_function][None].interface.spec.__doc__}  # for doc
-                            else:
-                                routesdoc[router_base_url + url].update(
-                                    {method: routers[method_function][None].interface.spec.__doc__})  # for doc
-
-                        if self.versions and self.versions != (None,):
-                            for ver in self.versions:
-                                if ver == None:
-                                    continue
-                                if routers[method_function].get(ver):
-                                    app.add_route(handler=routers[method_function][ver],
-                                                  uri=router_base_url + '/v%s' % (ver) + url,
-                                                  methods=[method])
-                                    if router_base_url + '/v%s' % (ver) + url not in routesdoc:
-                                        routesdoc[router_base_url + '/v%s' % (ver) + url] = {
-                                            method: routers[method_function][ver].interface.spec.__doc__}  # for doc
-                                    else:
-                                        routesdoc[router_base_url + '/v%s' % (ver) + url].update(
-                                            {method: routers[method_function][ver].interface.spec.__doc__})  # for doc
-                                else:
-                                    app.add_route(
-                                        handler=routers[method_function][list(routers[method_function].keys())[0]],
-                                        uri=router_base_url + '/v%s' % (ver) + url,
-                                        methods=[method]
-                                    )
-                                    if router_base_url + '/v%s' % (ver) + url not in routesdoc:
-                                        routesdoc[router_base_url + '/v%s' % (ver) + url] = {
-                                            method: routers[method_function][list(routers[method_function].keys())[
-                                                0]].interface.spec.__doc__}  # for doc
-                                    else:
-                                        routesdoc[router_base_url + '/v%s' % (ver) + url].update({method: routers[
-                                            method_function][list(routers[method_function].keys())[
-                                            0]].interface.spec.__doc__})  # for doc
+        compiled_handlers = {}
 
-        # if DEBUG:
-        #     setup_swagger(app, routesdoc)
+        def endpoint(interface):
+            if not compiled:
+                return interface
+            if interface not in compiled_handlers:
+                compiled_handlers[interface] = interface.compile()
+            return compiled_handlers[interface]
 
         default_not_found = self.documentation_404() if default_not_found is True else None
         not_found_handler = default_not_found
@@ -381,6 +434,37 @@ class HTTPInterfaceAPI(InterfaceAPI):
             if len(self.not_found_handlers) == 1 and None in self.not_found_handlers:
                 not_found_handler = self.not_found_handlers[None]
 
+        if route_tree:
+            tree = hug.route_tree.RouteTree(self.versions)
+            for router_base_url, routes in self.routes.items():
+                for url, methods in routes.items():
+                    for method, versions in methods.items():
+                        for version, interface in versions.items():
+                            tree.add(router_base_url + url, method, version, endpoint(interface))
+
+            dispatch = tree.handler(not_found_handler, self.determine_version)
+            app.add_route(dispatch, '/', methods=HTTP_METHODS, name='hug')
+            app.add_route(dispatch, '/<path:path>', methods=HTTP_METHODS, name='hug_path')
+            return app
+
+        versioned = any(version is not None for version in self.versions)
+        routesdoc = {}
+        for router_base_url, routes in self.routes.items():
+            for url, methods in routes.items():
+                for method, versions in methods.items():
+                    handlers = {version: endpoint(interface) for version, interface in versions.items()}
+                    route = self.version_router(handlers, not_found_handler)
+                    uris = [router_base_url + url]
+                    if versioned:
+                        uris.append(router_base_url + '/v<api_version:int>' + url)
+                    for uri in uris:
+                        app.add_route(route, uri, methods=[method], name='{0} {1}'.format(method, uri))
+                        interface = versions.get(None) or next(iter(versions.values()))
+                        routesdoc.setdefault(uri, {})[method] = interface.interface.spec.__doc__  # for doc
+
+        # if DEBUG:
+        #     setup_swagger(app, routesdoc)
+
         if not_found_handler:
             app._not_found = not_found_handler
         return app
@@ -21,23 +21,39 @@ OTHER DEALINGS IN THE SOFTWARE.
 """
 from __future__ import absolute_import
 
+import asyncio
 import base64
 import binascii
+import hashlib
+import hmac
+import os
+from inspect import isawaitable
 
 import sanic
 
+import hug.cache
+import hug.tokens
+
+UNVERIFIED = object()
+PASSWORD_ITERATIONS = 100000
+
+async def resolve(result):
+    """Returns the result of a verify_user call, awaiting it first if it's awaitable"""
+    return (await result) if isawaitable(result) else result
+
 
 def authenticator(function, challenges=()):
     """Wraps authentication logic, verify_user through to the authentication function.
 
     The verify_user function passed in should accept an API key and return a user object to
-    store in the request context if authentication succeeded.
+    store in the request context if authentication succeeded. Both it and the authentication
+    function may be coroutines.
     """
     challenges = challenges or ('{} realm="simple"'.format(function.__name__), )
 
     def wrapper(verify_user):
-        def authenticate(request, response, **kwargs):
-            result = function(request, response, verify_user, **kwargs)
+        async def authenticate(request, response, **kwargs):
+            result = await resolve(function(request, response, verify_user, **kwargs))
             if result is None:
                 raise sanic.web.HTTPForbidden('Authentication Required',
                                        'Please provide valid {0} credentials'.format(function.__doc__.splitlines()[0]))
@@ -56,10 +72,10 @@ def authenticator(function, challenges=()):
 
 
 @authenticator
-def basic(request, response, verify_user, realm='simple', **kwargs):
+async def basic(request, response, verify_user, realm='simple', **kwargs):
     """Basic HTTP Authentication"""
-    http_auth = request.auth
-    response.set_header('WWW-Authenticate', 'Basic')
+    http_auth = request.headers.get('Authorization')
+    response.headers['WWW-Authenticate'] = 'Basic'
     if http_auth is None:
         return
 
@@ -74,28 +90,28 @@ def basic(request, response, verify_user, realm='simple', **kwargs):
     if auth_type.lower() == 'basic':
         try:
             user_id, key = base64.decodebytes(bytes(user_and_key.strip(), 'utf8')).decode('utf8').split(':', 1)
-            user = verify_user(user_id, key)
-            if user:
-                response.set_header('WWW-Authenticate', '')
-                return user
         except (binascii.Error, ValueError):
             raise sanic.web.HTTPForbidden('Authentication Error',
                                    'Unable to determine user and password with provided encoding')
+        user = await resolve(verify_user(user_id, key))
+        if user:
+            response.headers['WWW-Authenticate'] = ''
+            return user
     return False
 
 
 @authenticator
-def api_key(request, response, verify_user, **kwargs):
+async def api_key(request, response, verify_user, **kwargs):
     """API Key Header Authentication
 
     The verify_user function passed in to ths authenticator shall receive an
     API key as input, and return a user object to store in the request context
     if the request was successful.
     """
-    api_key = request.get_header('X-Api-Key')
+    api_key = request.headers.get('X-Api-Key')
 
     if api_key:
-        user = verify_user(api_key)
+        user = await resolve(verify_user(api_key))
         if user:
             return user
         else:
@@ -105,14 +121,14 @@ def api_key(request, response, verify_user, **kwargs):
 
 
 @authenticator
-def token(request, response, verify_user, **kwargs):
+async def token(request, response, verify_user, **kwargs):
     """Token verification
 
     Checks for the Authorization header and verifies using the verify_user function
     """
-    token = request.get_header('Authorization')
+    token = request.headers.get('Authorization')
     if token:
-        verified_token = verify_user(token)
+        verified_token = await resolve(verify_user(token))
         if verified_token:
             return verified_token
         else:
@@ -120,10 +136,117 @@ def token(request, response, verify_user, **kwargs):
     return None
 
 
+def signed_token(key_set=None, cache_entries=4096, leeway=0, max_age=300.0, scheme='Bearer'):
+    """Returns a token authenticator verifying signed (JWT, HMAC SHA-2) tokens against a hug.tokens.KeySet
+
+       The claims of a valid token are stored as the user in the request context. Verified tokens are remembered
+       until they expire, or for max_age seconds at most, so that they aren't decoded and verified again.
+       Without a key_set, tokens are verified using the TOKEN_SECRET_KEY setting.
+    """
+    return token(hug.tokens.Verifier(key_set, cache_entries, leeway, max_age, scheme))
+
+
 def verify(user, password):
     """Returns a simple verification callback that simply verifies that the users and password match that provided"""
+    user, password = user.encode('utf8'), password.encode('utf8')
+
     def verify_user(user_name, user_password):
-        if user_name == user and user_password == password:
+        if hmac.compare_digest(user_name.encode('utf8'), user) & \
+           hmac.compare_digest(user_password.encode('utf8'), password):
             return user_name
         return False
     return verify_user
+
+
+def hash_password(password, salt=None, iterations=PASSWORD_ITERATIONS):
+    """Returns a salted PBKDF2-SHA256 hash of the password, in the form stored by credential tables"""
+    salt = salt or binascii.hexlify(os.urandom(16)).decode('ascii')
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf8'), salt.encode('utf8'), iterations)
+    return 'pbkdf2_sha256${0}${1}${2}'.format(iterations, salt, binascii.hexlify(digest).decode('ascii'))
+
+
+def check_password(password, password_hash):
+    """Returns True if the password matches a hash returned by hash_password, comparing them in constant time"""
+    try:
+        algorithm, iterations, salt, expected = password_hash.split('$')
+        iterations = int(iterations)
+    except ValueError:
+        return False
+    if algorithm != 'pbkdf2_sha256':
+        return False
+
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf8'), salt.encode('utf8'), iterations)
+    return hmac.compare_digest(binascii.hexlify(digest).decode('ascii'), expected)
+
+
+def load_credentials(path):
+    """Returns the {user: password hash} table stored in a file, as one `user:hash` line per user"""
+    credentials = {}
+    with open(path) as credentials_file:
+        for line in credentials_file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                user, password_hash = line.split(':', 1)
+                credentials[user] = password_hash
+    return credentials
+
+
+def verify_hashed(credentials, cache_entries=1024):
+    """Returns a verification coroutine checking users and passwords against a {user: password hash} table
+
+       Since hashes are deliberately slow to compute, they are computed in an executor, and the most recently
+       verified pairs are remembered (as a keyed hash, never the password itself) so that they needn't be again.
+       Unknown users are checked against a placeholder hash, so that they take as long to reject as bad passwords.
+    """
+    verified = hug.cache.LRU(cache_entries)
+    secret = os.urandom(32)
+    placeholder = hash_password(binascii.hexlify(os.urandom(16)).decode('ascii'))
+
+    async def verify_user(user_name, user_password):
+        password_hash = credentials.get(user_name)
+        key = hmac.new(secret, '\0'.join((user_name, user_password, password_hash or '')).encode('utf8'),
+                       hashlib.sha256).digest()
+        if key in verified:
+            return verified.get(key)
+
+        loop = asyncio.get_event_loop()
+        matches = await loop.run_in_executor(None, check_password, user_password, password_hash or placeholder)
+        if not matches or password_hash is None:
+            return False
+        return verified.set(key, user_name)
+
+    verify_user.verified = verified
+    return verify_user
+
+
+def cached(verify_user, ttl=60.0, invalid_ttl=5.0, max_entries=4096):
+    """Returns a verify_user coroutine that remembers what verify_user returned for each set of credentials
+
+       Verified users are remembered for ttl seconds, and rejected credentials for invalid_ttl seconds, so that
+       repeatedly retried bad keys don't reach the underlying verification either. Credentials are only kept as a
+       SHA-256 hash, and concurrent verifications of the same credentials share a single call to verify_user
+       that is not cancelled along with any one of the requests waiting on it.
+    """
+    results = hug.cache.TTL(max_entries, ttl)
+    pending = {}
+
+    async def verify_cached(*credentials):
+        key = hashlib.sha256('\0'.join(str(credential) for credential in credentials).encode('utf8')).digest()
+        user = results.get(key, UNVERIFIED)
+        if user is not UNVERIFIED:
+            return user
+
+        verification = pending.get(key)
+        if verification is None:
+            verification = pending[key] = asyncio.ensure_future(resolve(verify_user(*credentials)))
+            verification.add_done_callback(lambda done: finished(key, done))
+        return await asyncio.shield(verification)
+
+    def finished(key, verification):
+        pending.pop(key, None)
+        if not verification.cancelled() and verification.exception() is None:
+            user = verification.result()
+            results.set(key, user, ttl=None if user else invalid_ttl)
+
+    verify_cached.results = results
+    return verify_cached
@@ -0,0 +1,187 @@
+"""hug/cache.py
+
+Defines the bounded in-memory caches used by hug to avoid repeating work between requests
+
+Copyright (C) 2016  Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+from __future__ import absolute_import
+
+import os
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+
+class LRU(object):
+    """A mapping that evicts its least recently used items once it holds more than max_entries of them, or their
+       combined size exceeds max_bytes
+    """
+    __slots__ = ('max_entries', 'max_bytes', 'bytes', 'items')
+
+    def __init__(self, max_entries=1024, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.items = OrderedDict()
+
+    def get(self, key, default=None):
+        """Returns the value stored for key, marking it as the most recently used, or default if there is none"""
+        try:
+            value, size = self.items[key]
+        except KeyError:
+            return default
+        self.items.move_to_end(key)
+        return value
+
+    def set(self, key, value, size=0):
+        """Stores value under key, accounting size bytes towards max_bytes, and evicts any items that no longer fit"""
+        self.pop(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return value
+
+        self.items[key] = (value, size)
+        self.bytes += size
+        while len(self.items) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            evicted_key, (evicted_value, evicted_size) = self.items.popitem(last=False)
+            self.bytes -= evicted_size
+        return value
+
+    def pop(self, key, default=None):
+        """Removes and returns the value stored for key, or default if there is none"""
+        try:
+            value, size = self.items.pop(key)
+        except KeyError:
+            return default
+        self.bytes -= size
+        return value
+
+    def clear(self):
+        """Removes every item from the cache"""
+        self.items.clear()
+        self.bytes = 0
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+
+class TTL(LRU):
+    """An LRU whose items also expire once ttl seconds have passed since they were stored"""
+    __slots__ = ('ttl', )
+
+    def __init__(self, max_entries=1024, ttl=60.0, max_bytes=None):
+        super().__init__(max_entries, max_bytes)
+        self.ttl = ttl
+
+    def get(self, key, default=None):
+        """Returns the value stored for key, marking it as the most recently used, or default if there is none or
+           it has expired
+        """
+        entry = super().get(key)
+        if entry is None:
+            return default
+
+        value, expires = entry
+        if expires <= time.monotonic():
+            super().pop(key)
+            return default
+        return value
+
+    def set(self, key, value, size=0, ttl=None):
+        """Stores value under key for ttl seconds, defaulting to the ttl of the cache"""
+        super().set(key, (value, time.monotonic() + (self.ttl if ttl is None else ttl)), size)
+        return value
+
+    def pop(self, key, default=None):
+        entry = super().pop(key)
+        return default if entry is None else entry[0]
+
+    def __contains__(self, key):
+        entry = self.items.get(key)
+        return entry is not None and entry[0][1] > time.monotonic()
+
+
+class CachedFile(BytesIO):
+    """An in-memory copy of a file's contents, keeping the name and stat result of the file it was read from"""
+
+    def __init__(self, content, name, stat):
+        super().__init__(content)
+        self.name = name
+        self.stat = stat
+
+
+class FileCache(object):
+    """Caches what requested file names resolve to, along with the contents of small files
+
+       Cached entries are revalidated against the modification time, size, and inode of the file at most once every
+       check_interval seconds.
+    """
+    __slots__ = ('entries', 'max_file_size', 'check_interval')
+
+    def __init__(self, max_entries=1024, max_bytes=16777216, max_file_size=262144, check_interval=1.0):
+        self.entries = LRU(max_entries, max_bytes)
+        self.max_file_size = max_file_size
+        self.check_interval = check_interval
+
+    def get(self, name, resolve):
+        """Returns a CachedFile, or the path of files too large to keep in memory, for the requested name
+
+           resolve is only called with the name if it isn't cached or its file has changed, and must return the
+           path of the file it should be served from or None if there isn't one.
+        """
+        now = time.monotonic()
+        entry = self.entries.get(name)
+        if entry is not None:
+            path, stat, content, checked = entry
+            if now - checked < self.check_interval:
+                return self._file(path, stat, content)
+
+            try:
+                current = os.stat(path)
+            except OSError:
+                current = None
+            if current is not None and _version(current) == _version(stat):
+                entry[3] = now
+                return self._file(path, stat, content)
+            self.entries.pop(name)
+
+        path = resolve(name)
+        if path is None:
+            return None
+
+        stat = os.stat(path)
+        content = None
+        if stat.st_size <= self.max_file_size:
+            with open(path, 'rb') as cached_file:
+                content = cached_file.read()
+        self.entries.set(name, [path, stat, content, now], len(content) if content else 0)
+        return self._file(path, stat, content)
+
+    def clear(self):
+        """Removes every cached entry"""
+        self.entries.clear()
+
+    @staticmethod
+    def _file(path, stat, content):
+        return path if content is None else CachedFile(content, path, stat)
+
+
+def _version(stat):
+    return (stat.st_mtime, stat.st_size, stat.st_ino)
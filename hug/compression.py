@@ -0,0 +1,206 @@
+"""hug/compression.py
+
+Defines the Accept-Encoding negotiation and gzip / brotli response compression hug applies to rendered content
+
+Copyright (C) 2016  Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+from __future__ import absolute_import
+
+import asyncio
+import gzip
+import hashlib
+import os
+
+import hug.cache
+
+try:  # pragma: no cover - brotli is an optional dependency
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+CONTENT_TYPES = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+                 'application/xml', 'image/svg+xml')
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def _gzip(body, level):
+    return gzip.compress(body, compresslevel=level)
+
+
+def _brotli(body, level):
+    return brotli.compress(body, quality=level)
+
+
+ENCODERS = {'gzip': (_gzip, 6)}
+if brotli:
+    ENCODERS['br'] = (_brotli, 5)
+
+
+def accepted_encodings(accept_encoding):
+    """Returns a dictionary of the content codings found in an Accept-Encoding header to their quality values"""
+    encodings = {}
+    for coding in accept_encoding.split(','):
+        name, _, parameters = coding.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        quality = 1.0
+        parameter, _, value = parameters.partition('=')
+        if parameter.strip().lower() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+def negotiate(accept_encoding, available):
+    """Returns the first of the available content codings the client accepts with the highest quality, or None"""
+    if not accept_encoding:
+        return None
+
+    accepted = accepted_encodings(accept_encoding)
+    wildcard = accepted.get('*', 0.0)
+    chosen, chosen_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, wildcard)
+        if quality > chosen_quality:
+            chosen, chosen_quality = encoding, quality
+    return chosen
+
+
+class Compression(object):
+    """Defines when, and how, rendered content is compressed before being sent
+
+       Bodies smaller than threshold bytes, or with a content type that doesn't start with any of content_types, are
+       sent as is. Bodies of at least executor_threshold bytes are compressed in the event loop's executor, so that
+       they don't hold up other requests. When cache_bytes is set, compressed bodies are kept in a size bounded LRU,
+       keyed by a digest of the body, so that routes rendering the same content again don't have to compress it
+       again. Static files with a precompressed sibling (`file.css.br`, `file.css.gz`) that's at least as new as the
+       file itself are served from the sibling.
+    """
+    __slots__ = ('threshold', 'content_types', 'encodings', 'levels', 'precompressed', 'cache', 'executor_threshold')
+
+    def __init__(self, threshold=1024, content_types=CONTENT_TYPES, encodings=('br', 'gzip'), levels=None,
+                 precompressed=True, cache_bytes=0, cache_entries=1024, executor_threshold=65536):
+        self.threshold = threshold
+        self.executor_threshold = executor_threshold
+        self.content_types = tuple(content_types)
+        self.encodings = tuple(encoding for encoding in encodings if encoding in ENCODERS)
+        self.levels = levels or {}
+        self.precompressed = tuple(encoding for encoding in encodings if encoding in SUFFIXES) if precompressed else ()
+        self.cache = hug.cache.LRU(cache_entries, cache_bytes) if cache_bytes else None
+
+    def compresses(self, content_type):
+        """Returns True if content of the given type should be compressed"""
+        return bool(content_type) and content_type.startswith(self.content_types)
+
+    def encoding(self, request):
+        """Returns the content coding that should be used to respond to the request, or None"""
+        return negotiate(request.headers.get('Accept-Encoding'), self.encodings)
+
+    def encode(self, body, encoding):
+        """Returns the body compressed using the given content coding, without consulting the cache"""
+        encoder, default_level = ENCODERS[encoding]
+        return encoder(body, self.levels.get(encoding, default_level))
+
+    def cache_key(self, body, encoding):
+        """Returns the key compressed copies of the body are cached under, or None when nothing is cached"""
+        return None if self.cache is None else (encoding, hashlib.sha1(body).digest())
+
+    def compress(self, body, encoding):
+        """Returns the body compressed using the given content coding"""
+        key = self.cache_key(body, encoding)
+        compressed = None if key is None else self.cache.get(key)
+        if compressed is None:
+            compressed = self.encode(body, encoding)
+            if key is not None:
+                self.cache.set(key, compressed, len(compressed))
+        return compressed
+
+    async def compress_async(self, body, encoding):
+        """Returns the body compressed using the given content coding, off the event loop if it's large"""
+        if len(body) < self.executor_threshold:
+            return self.compress(body, encoding)
+
+        loop = asyncio.get_event_loop()
+        key = None if self.cache is None else await loop.run_in_executor(None, self.cache_key, body, encoding)
+        compressed = None if key is None else self.cache.get(key)
+        if compressed is None:
+            compressed = await loop.run_in_executor(None, self.encode, body, encoding)
+            if key is not None:
+                self.cache.set(key, compressed, len(compressed))
+        return compressed
+
+    async def apply(self, request, response):
+        """Compresses the body of a rendered response in place, if the request and response allow it"""
+        body = response.body
+        if not isinstance(body, bytes) or len(body) < self.threshold or response.status in (204, 206, 304) or \
+           'Content-Encoding' in response.headers or not self.compresses(response.content_type):
+            return response
+
+        vary(response)
+        encoding = self.encoding(request)
+        if encoding:
+            response.body = await self.compress_async(body, encoding)
+            response.headers['Content-Encoding'] = encoding
+            weaken_etag(response)
+        return response
+
+    def sibling(self, request, path, stat):
+        """Returns the (encoding, path) of a precompressed sibling of the file at path to send instead, or None"""
+        if not self.precompressed:
+            return None
+
+        accepted = request.headers.get('Accept-Encoding')
+        if not accepted:
+            return None
+
+        accepted = accepted_encodings(accepted)
+        wildcard = accepted.get('*', 0.0)
+        candidates = sorted(((accepted.get(encoding, wildcard), -index, encoding)
+                             for index, encoding in enumerate(self.precompressed)), reverse=True)
+        for quality, preference, encoding in candidates:
+            if quality <= 0:
+                break
+            try:
+                sibling_stat = os.stat(path + SUFFIXES[encoding])
+            except OSError:
+                continue
+            if sibling_stat.st_mtime >= stat.st_mtime:
+                return encoding, path + SUFFIXES[encoding]
+        return None
+
+
+def weaken_etag(response):
+    """Makes the entity tag of a response weak, as its encoded bytes no longer match those it was computed from"""
+    entity_tag = response.headers.get('ETag')
+    if entity_tag and not entity_tag.startswith('W/'):
+        response.headers['ETag'] = 'W/' + entity_tag
+    return response
+
+
+def vary(response):
+    """Marks the response as varying on the Accept-Encoding request header"""
+    current = response.headers.get('Vary')
+    if not current:
+        response.headers['Vary'] = 'Accept-Encoding'
+    elif 'accept-encoding' not in current.lower():
+        response.headers['Vary'] = '{0}, Accept-Encoding'.format(current)
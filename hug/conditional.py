@@ -0,0 +1,135 @@
+"""hug/conditional.py
+
+Defines the validators (ETag / Last-Modified) and conditional GET (RFC 7232) handling hug uses when sending files
+
+Copyright (C) 2016  Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+from __future__ import absolute_import
+
+import asyncio
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from functools import partial
+
+import hug.cache
+
+HASH_CHUNK_SIZE = 262144
+HASHED_PATHS = 1024
+CONDITIONAL_METHODS = ('GET', 'HEAD')
+content_etags = hug.cache.LRU(HASHED_PATHS)
+hashing = {}
+
+
+def etag(stat):
+    """Returns a strong entity tag for a file, built from the inode, size, and modification time of its stat result"""
+    return '"{0:x}-{1:x}-{2:x}"'.format(stat.st_ino, stat.st_size, int(stat.st_mtime * 1000000))
+
+
+def hash_file(path):
+    """Returns a strong entity tag built by hashing the contents of the file at path, reading it in full"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return '"{0}"'.format(digest.hexdigest())
+
+
+def content_etag(path, stat):
+    """Returns a strong entity tag built by hashing the contents of the file at path, or None until it's known
+
+       Hashes are cached per path, and only recomputed once the inode, size, or modification time of the file change.
+       Within a running event loop files are hashed in its executor, so that reading them never blocks the loop, and
+       None is returned until that completes. Outside of one, the file is hashed right away.
+    """
+    key = (path, stat.st_ino, stat.st_size, stat.st_mtime)
+    entity_tag = content_etags.get(key)
+    if entity_tag is not None or key in hashing:
+        return entity_tag
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return content_etags.set(key, hash_file(path))
+
+    hashing[key] = loop.run_in_executor(None, hash_file, path)
+    hashing[key].add_done_callback(partial(_hashed, key))
+    return None
+
+
+def _hashed(key, hashed):
+    del hashing[key]
+    if not hashed.cancelled() and hashed.exception() is None:
+        content_etags.set(key, hashed.result())
+
+
+def http_date(timestamp):
+    """Returns the provided POSIX timestamp formatted as an HTTP date"""
+    return formatdate(timestamp, usegmt=True)
+
+
+def _parse_http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _opaque_tag(entity_tag):
+    return entity_tag[2:] if entity_tag.startswith('W/') else entity_tag
+
+
+def not_modified(request, entity_tag, modified):
+    """Returns True if the cached representation a GET or HEAD request is conditional on is still current
+
+       If-None-Match is evaluated using weak comparison and takes precedence over If-Modified-Since, which is
+       evaluated at the one second resolution of HTTP dates.
+    """
+    if request.method not in CONDITIONAL_METHODS:
+        return False
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        if if_none_match.strip() == '*':
+            return True
+        entity_tag = _opaque_tag(entity_tag)
+        return any(_opaque_tag(tag.strip()) == entity_tag for tag in if_none_match.split(','))
+
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and int(modified) <= since
+
+    return False
+
+
+def check(path, request, response, hash_content=False, stat=None):
+    """Sets the ETag and Last-Modified headers for the file at path, setting a 304 status if it isn't modified
+
+       Returns True if the request's validators match and so nothing but the headers should be sent.
+       Since only the stat result is needed, this can be done before the file is ever opened. With hash_content, the
+       entity tag is built from the file's contents once they have been hashed, and from its stat result until then.
+    """
+    stat = os.stat(path) if stat is None else stat
+    entity_tag = (hash_content and content_etag(path, stat)) or etag(stat)
+    response.headers['ETag'] = entity_tag
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    if response.status == 200 and not_modified(request, entity_tag, stat.st_mtime):
+        response.set_status(304)
+        return True
+    return False
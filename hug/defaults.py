@@ -25,6 +25,12 @@ import hug
 
 output_format = hug.output_format.json
 
+json_encoder = hug.output_format.json_encoders['json']
+
+hash_file_etags = False
+
+memoize_types = 0
+
 input_format = {
     'application/json': hug.input_format.json,
     'application/x-www-form-urlencoded': hug.input_format.urlencoded,
@@ -36,3 +36,7 @@ class StoreKeyNotFound(Exception):
 class SessionNotFound(StoreKeyNotFound):
     """Should be raised when a session ID has not been found inside a session store"""
     pass
+
+
+class InvalidToken(Exception):
+    """Should be raised when a signed token is malformed, has an invalid signature, or has expired"""
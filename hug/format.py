@@ -45,6 +45,16 @@ def content_type(content_type):
     return decorator
 
 
+def stream_framing(start=b'', separator=b'', end=b''):
+    """Attaches the bytes written before, between, and after each item when a Hug formatting function streams the
+       items produced by an iterator
+    """
+    def decorator(method):
+        method.stream_framing = (start, separator, end)
+        return method
+    return decorator
+
+
 def underscore(text):
     """Converts text that may be camelcased into an underscored format"""
     return UNDERSCORE[1].sub(r'\1_\2', UNDERSCORE[0].sub(r'\1_\2', text)).lower()
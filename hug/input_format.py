@@ -21,13 +21,25 @@ OTHER DEALINGS IN THE SOFTWARE.
 """
 from __future__ import absolute_import
 
+import codecs
+import re
 import ujson as json_converter
+from json import JSONDecoder
 from urllib.parse import parse_qs
 from cgi import parse_header
 
+import sanic
 from sanic.request import RequestParameters, parse_multipart_form
 from hug.format import content_type, underscore
 
+STREAM_CHUNK_SIZE = 65536
+WHITESPACE = ' \t\n\r'
+ARRAY_DELIMITERS = WHITESPACE + ',]'
+SKIP_WHITESPACE = re.compile('[{0}]*'.format(WHITESPACE)).match
+SCALAR_END = re.compile('[{0}]'.format(re.escape(ARRAY_DELIMITERS))).search
+CONTAINER_TOKEN = re.compile(r'["\[\]{}]').search
+STRING_TOKEN = re.compile(r'["\\]').search
+
 
 @content_type('text/plain')
 async def text(body, charset='utf-8', **kwargs):
@@ -40,9 +52,146 @@ async def text(body, charset='utf-8', **kwargs):
 async def json(body, charset='utf-8', **kwargs):
     """Takes JSON formatted data, converting it into native Python objects"""
     stream = await body.read()
+    if charset.lower().replace('-', '') == 'utf8':
+        return json_converter.loads(stream)
     return json_converter.loads(stream.decode(charset))
 
 
+class _ValueScanner(object):
+    """Finds where a JSON value being received ends, remembering how far it got so each character is scanned once"""
+    __slots__ = ('scanned', 'depth', 'in_string')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.scanned = 0
+        self.depth = 0
+        self.in_string = False
+
+    def end(self, buffer, start):
+        """Returns the index just past the value starting at start, or None if it hasn't all been received yet"""
+        index = start + self.scanned
+        if buffer[start] not in '[{"':
+            match = SCALAR_END(buffer, index)
+            if match:
+                self.reset()
+                return match.start()
+            self.scanned = len(buffer) - start
+            return None
+
+        if not self.scanned:
+            self.in_string = buffer[start] == '"'
+            self.depth = 0 if self.in_string else 1
+            index += 1
+
+        while True:
+            match = (STRING_TOKEN if self.in_string else CONTAINER_TOKEN)(buffer, index)
+            if not match:
+                index = len(buffer)
+                break
+
+            token = match.group()
+            if token == '\\':
+                if match.end() == len(buffer):
+                    index = match.start()
+                    break
+                index = match.end() + 1
+                continue
+
+            index = match.end()
+            if token == '"':
+                self.in_string = not self.in_string
+            elif token in '[{':
+                self.depth += 1
+            else:
+                self.depth -= 1
+            if not self.in_string and not self.depth:
+                self.reset()
+                return index
+
+        self.scanned = index - start
+        return None
+
+
+def json_stream(max_body_size=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Creates a JSON input format that decodes the body while it arrives instead of once it has all been read.
+
+    Top level arrays are decoded element by element, so only the current chunk and the already decoded objects are
+    held in memory. An element is only decoded once it has been received in full, so elements spanning many chunks
+    are still decoded in linear time. Bodies larger than max_body_size bytes are rejected as soon as that size is
+    exceeded.
+    """
+    decoder = JSONDecoder()
+
+    @content_type('application/json')
+    async def streamed_json(body, charset='utf-8', **kwargs):
+        """Takes JSON formatted data, converting it into native Python objects as it is received"""
+        read_chunk = getattr(body, 'readany', None)
+        text_decoder = codecs.getincrementaldecoder(charset)()
+        buffer = ''
+        received = 0
+        items = None  # becomes a list for top level arrays, False for anything that has to be decoded in one go
+        expecting = 'value_or_end'
+        finished = False
+        scanner = _ValueScanner()
+
+        while True:
+            chunk = await read_chunk() if read_chunk else await body.read(chunk_size)
+            received += len(chunk)
+            if max_body_size is not None and received > max_body_size:
+                raise sanic.web.HTTPRequestEntityTooLarge(max_size=max_body_size, actual_size=received)
+
+            end_of_body = not chunk
+            buffer += text_decoder.decode(chunk, final=end_of_body)
+            if items is None:
+                start = buffer.lstrip(WHITESPACE)
+                if start.startswith('['):
+                    buffer = start[1:]
+                    items = []
+                elif start:
+                    items = False
+
+            if items is None or items is False:
+                if end_of_body:
+                    return json_converter.loads(buffer)
+                continue
+
+            position = 0
+            while not finished:
+                position = SKIP_WHITESPACE(buffer, position).end()
+                if position == len(buffer):
+                    break
+
+                if buffer[position] == ']' and expecting != 'value':
+                    finished = True
+                    position += 1
+                elif expecting == 'comma_or_end':
+                    if buffer[position] != ',':
+                        raise ValueError('Expected "," or "]" at position {0} of JSON array'.format(position))
+                    expecting = 'value'
+                    position += 1
+                else:
+                    if scanner.end(buffer, position) is None and not end_of_body:
+                        break
+                    item, item_end = decoder.raw_decode(buffer, position)
+                    scanner.reset()
+                    items.append(item)
+                    position = item_end
+                    expecting = 'comma_or_end'
+            buffer = buffer[position:]
+
+            if finished:
+                if buffer.strip(WHITESPACE):
+                    raise ValueError('Extra data found after the end of the JSON array')
+                if end_of_body:
+                    return items
+            elif end_of_body:
+                raise ValueError('Unterminated JSON array')
+
+    return streamed_json
+
+
 def _underscore_dict(dictionary):
     new_dictionary = {}
     for key, value in dictionary.items():
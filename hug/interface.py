@@ -22,22 +22,44 @@ OTHER DEALINGS IN THE SOFTWARE.
 from __future__ import absolute_import
 
 import argparse
+import asyncio
+import logging
 import os
 import sys
 from collections import OrderedDict
 from functools import lru_cache, partial, wraps
+from inspect import isawaitable
 
 import sanic
 
 import hug._empty as empty
 import hug.api
+import hug.cache
+import hug.compression
+import hug.conditional
 import hug.output_format
+import hug.ranges
 import hug.types as types
 from hug import introspect
 from hug.exceptions import InvalidTypeData
 from hug.format import parse_content_type
 from hug.types import MarshmallowSchema, Multiple, OneOf, SmartBoolean, Text, text
 
+FILE_CHUNK_SIZE = 262144
+
+
+def streams(content):
+    """Returns True if the content is an iterator or asynchronous iterator to stream, rather than a file-like object"""
+    return hasattr(content, '__anext__') or (hasattr(content, '__next__') and not hasattr(content, 'read'))
+
+
+def file_descriptor(content):
+    """Returns the operating system file descriptor backing a file-like object, or None if it isn't backed by one"""
+    try:
+        return content.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
 
 class Interfaces(object):
     """Defines the per-function singleton applied to hugged functions defining common data needed by all interfaces"""
@@ -86,6 +108,8 @@ class Interfaces(object):
                 transformer = MarshmallowSchema(transformer)
             elif hasattr(transformer, 'deserialize'):
                 transformer = transformer.deserialize
+            elif hug.defaults.memoize_types:
+                transformer = types.memoize(transformer, hug.defaults.memoize_types)
 
             self.input_transformations[name] = transformer
 
@@ -196,14 +220,17 @@ class Interface(object):
             errors = self.validate_function(input_parameters)
         return errors
 
-    def check_requirements(self, request=None, response=None):
+    async def check_requirements(self, request=None, response=None):
         """Checks to see if all requirements set pass
 
            if all requirements pass nothing will be returned
            otherwise, the error reported will be returned
+           Requirements are evaluated one at a time in the order declared, awaiting any that are coroutines.
         """
         for requirement in self.requires:
             conclusion = requirement(response=response, request=request, module=self.api.module)
+            if isawaitable(conclusion):
+                conclusion = await conclusion
             if conclusion and conclusion is not True:
                 return conclusion
 
@@ -254,16 +281,25 @@ class HTTP(Interface):
     """Defines the interface responsible for wrapping functions and exposing them via HTTP based on the route"""
     __slots__ = ('_params_for_outputs', '_params_for_invalid_outputs', '_params_for_transform', 'on_invalid',
                  '_params_for_on_invalid', 'set_status', 'response_headers', 'transform', 'input_transformations',
-                 'examples', 'wrapped', 'catch_exceptions', 'parse_body', 'private')
+                 'examples', 'wrapped', 'catch_exceptions', 'parse_body', 'private', 'gather_names', 'compress',
+                 'versions', 'transform_items')
     AUTO_INCLUDE = {'request', 'response'}
+    INJECTED = {'request', 'response', 'api_version', 'body'}
 
     def __init__(self, route, function, catch_exceptions=True):
         super().__init__(route, function)
         self.catch_exceptions = catch_exceptions
         self.parse_body = 'parse_body' in route
+        self.transform_items = 'transform_items' in route
         self.set_status = route.get('status', False)
         self.response_headers = tuple(route.get('response_headers', {}).items())
         self.private = 'private' in route
+        compress = route.get('compress', None)
+        if compress is True:
+            compress = hug.compression.Compression()
+        elif isinstance(compress, dict):
+            compress = hug.compression.Compression(**compress)
+        self.compress = compress
 
         self._params_for_outputs = introspect.takes_arguments(self.outputs, *self.AUTO_INCLUDE)
         self._params_for_transform = introspect.takes_arguments(self.transform, *self.AUTO_INCLUDE)
@@ -276,32 +312,39 @@ class HTTP(Interface):
         elif self.transform:
             self._params_for_on_invalid = self._params_for_transform
 
-        if route['versions']:
-            self.api.http.versions.update(route['versions'])
+        self.versions = tuple(sorted(route['versions'], key=str)) if route['versions'] else ()
+        if self.versions:
+            self.api.http.versions.update(self.versions)
+
+        if self.interface.takes_kwargs:
+            self.gather_names = None
+        else:
+            self.gather_names = tuple(self.all_parameters.difference(self.INJECTED, self.directives))
 
         self.interface.http = self
 
     async def gather_parameters(self, request, response, api_version=None, **input_parameters):
-        """Gathers and returns all parameters that will be used for this endpoint"""
-        paras = await request.post()
-        input_parameters.update(paras)
-        paras = request.GET
-        input_parameters.update(paras)
-
-        if self.parse_body and request.content_length:
-            # body = request.stream
-            body = request.content
-            content_type, content_params = parse_content_type(request.content_type)
-            body_formatter = self.api.http.input_format(content_type) if body else ''
-
-            if body_formatter:
-                body = await body_formatter(body, **content_params)
+        """Gathers and returns all parameters that will be used for this endpoint
+
+           Parameters are taken, in order of precedence, from the body, the query string, the posted form and
+           finally the URL. Functions that don't accept **kwargs only have the names they declare looked up, and the
+           body is only decoded if they take `body` itself or declare a name that has to be looked up.
+        """
+        reads_body = bool(self.parse_body and request.content_length)
+        if self.gather_names is None:
+            body = await self.read_body(request) if reads_body else None
+            input_parameters.update(await request.post())
+            input_parameters.update(request.GET)
             if 'body' in self.all_parameters:
                 input_parameters['body'] = body
             if isinstance(body, dict):
                 input_parameters.update(body)
         elif 'body' in self.all_parameters:
-            input_parameters['body'] = None
+            body = await self.read_body(request) if reads_body else None
+            input_parameters = await self._gather_declared(request, body, input_parameters)
+            input_parameters['body'] = body
+        else:
+            input_parameters = await self._gather_declared(request, None, input_parameters, reads_body)
 
         if 'request' in self.all_parameters:
             input_parameters['request'] = request
@@ -316,6 +359,48 @@ class HTTP(Interface):
 
         return input_parameters
 
+    async def _gather_declared(self, request, body, url_parameters, reads_body=False):
+        """Looks up only the declared parameter names, without merging every input source into one dictionary
+
+           With reads_body, the request body is decoded here, once it's known there are names to look up in it. The
+           posted form is only read if the body and query string leave some of the names unset.
+        """
+        input_parameters = {}
+        if not self.gather_names:
+            return input_parameters
+
+        if reads_body:
+            body = await self.read_body(request)
+        body = body if isinstance(body, dict) else empty.dict
+        query = request.GET
+        missing = []
+        for name in self.gather_names:
+            if name in body:
+                input_parameters[name] = body[name]
+            elif name in query:
+                input_parameters[name] = query[name]
+            else:
+                missing.append(name)
+
+        if missing:
+            form = await request.post()
+            for name in missing:
+                if name in form:
+                    input_parameters[name] = form[name]
+                elif name in url_parameters:
+                    input_parameters[name] = url_parameters[name]
+        return input_parameters
+
+    async def read_body(self, request):
+        """Reads and decodes the request body using the input format registered for its content type"""
+        body = request.content
+        content_type, content_params = parse_content_type(request.content_type)
+        body_formatter = self.api.http.input_format(content_type) if body else ''
+
+        if body_formatter:
+            body = await body_formatter(body, **content_params)
+        return body
+
     @property
     def outputs(self):
         return getattr(self, '_outputs', self.api.http.output_format)
@@ -347,6 +432,12 @@ class HTTP(Interface):
         else:
             return self.invalid_outputs.content_type
 
+    def compression(self):
+        """Returns the Compression applied to this endpoint's responses, falling back to the API wide one, or None"""
+        if self.compress is None:
+            return self.api.http.compression
+        return self.compress or None
+
     def _arguments(self, requested_params, request=None, response=None):
         if requested_params:
             arguments = {}
@@ -381,9 +472,13 @@ class HTTP(Interface):
         return response
 
     async def call_function(self, **parameters):
-        if not self.interface.takes_kwargs:
-            parameters = {key: value for key, value in parameters.items() if key in self.all_parameters}
-        res = await self.interface(**parameters)
+        """Calls the wrapped function with the parameters produced by `gather_parameters`
+
+           Generator and asynchronous generator functions are returned as is, to be streamed by `render_content`
+        """
+        res = self.interface(**parameters)
+        if isawaitable(res):
+            res = await res
         return res
 
     async def render_content(self, content, request, response, **kwargs):
@@ -394,46 +489,201 @@ class HTTP(Interface):
                 content.interface.http(request, response, api_version=None, **kwargs)
             return
 
-        content = self.transform_data(content, request, response)
+        if not (self.transform_items and streams(content)):
+            content = self.transform_data(content, request, response)
+        if streams(content):
+            return await self.stream_content(content, request, response)
+
         content = self.outputs(content, **self._arguments(self._params_for_outputs, request, response))
         if hasattr(content, 'read'):
-            size = None
-            if hasattr(content, 'name') and os.path.isfile(content.name):
-                size = os.path.getsize(content.name)
-            if (request.headers.get('range', '') or request.headers.get('Range', '')) and size:
-                start, end = request.headers['range'].split('=')[1].split('-')  # todo
-                end = int(end)
-                start = int(start)
-                if end < 0:
-                    end = size + end
-                end = min(end, size)
-                length = end - start + 1
-                content.seek(start)
-                response.body = content.read(length)
-                response.set_status(206)
-                response.content_range = (start, end, size)
-                content.close()
-            else:
-                response.body = content.read()
-                if size:
-                    response.content_length = size
+            if file_descriptor(content) is not None or isinstance(content, hug.cache.CachedFile):
+                return await self.render_file(content, request, response)
+            response.body = content.read()
         else:
             response.body = content
+
+        compression = self.compression()
+        if compression:
+            await compression.apply(request, response)
         return response
 
+    async def render_file(self, content, request, response):
+        """Sends an operating system backed file to the client without loading it into memory
+
+           The length is taken from `os.fstat`, and the contents are handed to the kernel with `sendfile` when the
+           event loop and transport support it, falling back to reading the file in chunks otherwise. Files served
+           from a `hug.cache.FileCache` are sent from memory, using the stat result they were cached with.
+           Conditional requests are answered with a 304, and single, open-ended, suffix, and multiple byte Range
+           requests are honoured, guarded by If-Range.
+        """
+        try:
+            stat = content.stat if isinstance(content, hug.cache.CachedFile) else os.fstat(content.fileno())
+            modified = stat.st_mtime
+            entity_tag = response.headers.setdefault('ETag', hug.conditional.etag(stat))
+            response.headers.setdefault('Last-Modified', hug.conditional.http_date(modified))
+            response.headers['Accept-Ranges'] = 'bytes'
+
+            compression = self.compression()
+            if compression and compression.compresses(response.content_type):
+                hug.compression.vary(response)
+                sibling = content.tell() == 0 and isinstance(getattr(content, 'name', None), str) and \
+                    compression.sibling(request, content.name, stat)
+                if sibling:
+                    encoding, path = sibling
+                    content.close()
+                    content = open(path, 'rb')
+                    stat = os.fstat(content.fileno())
+                    response.headers['Content-Encoding'] = encoding
+                    entity_tag = hug.compression.weaken_etag(response).headers['ETag']
+
+            if response.status == 200 and hug.conditional.not_modified(request, entity_tag, modified):
+                response.set_status(304)
+                return response
+
+            offset = content.tell()
+            size = max(stat.st_size - offset, 0)
+            ranges = None
+            range_header = request.headers.get('Range')
+            if range_header and response.status == 200 and \
+               hug.ranges.if_range(request.headers.get('If-Range'), entity_tag, modified):
+                try:
+                    ranges = hug.ranges.parse(range_header, size)
+                except hug.ranges.RangeNotSatisfiable:
+                    response.set_status(416)
+                    response.headers['Content-Range'] = 'bytes */{0}'.format(size)
+                    response.body = b''
+                    return response
+
+            stream = sanic.web.StreamResponse(status=response.status, headers=response.headers)
+            if not ranges:
+                stream.content_length = size
+                await stream.prepare(request)
+                await self.send_file_range(stream, request, content, offset, size)
+            elif len(ranges) == 1:
+                (first, last), = ranges
+                stream.set_status(206)
+                stream.headers['Content-Range'] = 'bytes {0}-{1}/{2}'.format(first, last, size)
+                stream.content_length = last - first + 1
+                await stream.prepare(request)
+                await self.send_file_range(stream, request, content, offset + first, last - first + 1)
+            else:
+                boundary, parts, closing = hug.ranges.multipart(ranges, size, response.content_type)
+                stream.set_status(206)
+                stream.content_type = 'multipart/byteranges; boundary={0}'.format(boundary)
+                stream.content_length = sum(len(header) + last - first + 1 for header, first, last in parts) + \
+                    len(closing)
+                await stream.prepare(request)
+                for header, first, last in parts:
+                    await stream.write(header)
+                    await self.send_file_range(stream, request, content, offset + first, last - first + 1)
+                await stream.write(closing)
+
+            await stream.write_eof()
+            return stream
+        finally:
+            content.close()
+
+    async def send_file_range(self, stream, request, content, offset, count):
+        """Writes count bytes of a file, starting at offset, to a prepared stream response"""
+        if not count:
+            return
+
+        if isinstance(content, hug.cache.CachedFile):
+            content.seek(offset)
+            await stream.write(content.read(count))
+            return
+
+        loop = asyncio.get_event_loop()
+        transport = request.transport
+        if transport is not None and hasattr(loop, 'sendfile'):
+            try:
+                await loop.sendfile(transport, content, offset, count, fallback=False)
+                return
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        content.seek(offset)
+        while count > 0:
+            chunk = await loop.run_in_executor(None, content.read, min(FILE_CHUNK_SIZE, count))
+            if not chunk:
+                break
+            count -= len(chunk)
+            await stream.write(chunk)
+
+    async def stream_content(self, content, request, response):
+        """Streams the items produced by an iterator or asynchronous iterator using chunked transfer encoding
+
+           Every item is rendered by the endpoint's output format as soon as it is produced, written using the format's
+           `stream_framing` (for instance, as the elements of a JSON array), and transformed first if the route sets
+           `transform_items`. The first item is produced before the response is started, so errors raised right away
+           are still handled as usual. Once started, a response whose iterator fails is cut short by closing the
+           connection, so that clients can't mistake it for a complete one.
+        """
+        start, separator, end = getattr(self.outputs, 'stream_framing', (b'', b'', b''))
+        output_arguments = self._arguments(self._params_for_outputs, request, response)
+        asynchronous = hasattr(content, '__anext__')
+        exhausted = object()
+
+        async def next_item():
+            try:
+                return (await content.__anext__()) if asynchronous else next(content)
+            except (StopIteration, StopAsyncIteration):
+                return exhausted
+
+        item = await next_item()
+        stream = sanic.web.StreamResponse(status=response.status, headers=response.headers)
+        stream.enable_chunked_encoding()
+        await stream.prepare(request)
+        if start:
+            await stream.write(start)
+
+        written = False
+        try:
+            while item is not exhausted:
+                if self.transform_items:
+                    item = self.transform_data(item, request, response)
+                item = self.outputs(item, **output_arguments)
+                if hasattr(item, 'read'):
+                    item = item.read()
+                if isinstance(item, str):
+                    item = item.encode('utf8')
+                if written and separator:
+                    item = separator + item
+                written = True
+                await stream.write(item)
+                item = await next_item()
+        except Exception:
+            logging.getLogger('hug').exception('Streaming the response to {0} failed'.format(request.path))
+            if request.transport is not None:
+                request.transport.close()
+            return stream
+
+        if end:
+            await stream.write(end)
+        await stream.write_eof()
+        return stream
+
+    def exception_types(self, api_version=None):
+        """Returns the tuple of exception types this endpoint should catch and hand off to a registered handler"""
+        if not self.catch_exceptions:
+            return ()
+
+        return self.api.http.exception_lookup(api_version).types
+
+    async def handle_exception(self, exception, request, api_version=None, **kwargs):
+        """Routes a caught exception to the most appropriate exception handler registered against the API"""
+        handler = self.api.http.exception_lookup(api_version).handler(type(exception))
+        return await handler(request=request, exception=exception, **kwargs)
+
     async def __call__(self, request, api_version=None, **kwargs):
         """Call the wrapped function over HTTP pulling information as needed"""
         response = sanic.web.Response()
         api_version = int(api_version) if api_version is not None else api_version
-        if not self.catch_exceptions:
-            exception_types = ()
-        else:
-            exception_types = self.api.http.exception_handlers(api_version)
-            exception_types = tuple(exception_types.keys()) if exception_types else ()
+        exception_types = self.exception_types(api_version)
         try:
             self.set_response_defaults(response, request)
 
-            lacks_requirement = self.check_requirements(request, response)
+            lacks_requirement = await self.check_requirements(request, response)
             if lacks_requirement:
                 response.body = self.outputs(lacks_requirement,
                                              **self._arguments(self._params_for_outputs, request, response))
@@ -447,15 +697,67 @@ class HTTP(Interface):
             res_content = await self.call_function(**input_parameters)
             return await self.render_content(res_content, request, response, **kwargs)
         except exception_types as exception:
-            handler = None
-            if type(exception) in exception_types:
-                handler = self.api.http.exception_handlers(api_version)[type(exception)]
+            return await self.handle_exception(exception, request, api_version, **kwargs)
+
+    def compile(self):
+        """Returns a coroutine specialised to this endpoint that skips every request stage it does not make use of
+
+           The decisions normally made on every call of `__call__` (requirements, parameter gathering, validation,
+           exception handling) are made once here, so endpoints that don't use a feature don't pay for it.
+        """
+        requires = bool(self.requires)
+        gathers = bool(self.all_parameters or self.directives or self.interface.takes_kwargs)
+        validates = bool(self.interface.input_transformations or self.interface.required or
+                         getattr(self, 'validate_function', False))
+        catches = bool(self.catch_exceptions and getattr(self.api.http, '_exception_handlers', None))
+        response_headers = dict(self.response_headers)
+        set_status = self.set_status
+        content_type = None if callable(self.outputs.content_type) else self.outputs.content_type
+
+        async def endpoint(request, api_version, kwargs):
+            response = sanic.web.Response()
+            if response_headers:
+                response.headers.update(response_headers)
+            if set_status:
+                response.set_status(set_status)
+            response.content_type = content_type or self.content_type(request, response)
+
+            if requires:
+                lacks_requirement = await self.check_requirements(request, response)
+                if lacks_requirement:
+                    response.body = self.outputs(lacks_requirement,
+                                                 **self._arguments(self._params_for_outputs, request, response))
+                    return response
+
+            if gathers:
+                input_parameters = await self.gather_parameters(request, response, api_version, **kwargs)
+                if validates:
+                    errors = self.validate(input_parameters)
+                    if errors:
+                        return self.render_errors(errors, request, response)
+                content = await self.call_function(**input_parameters)
             else:
-                for exception_type, exception_handler in \
-                    tuple(self.api.http.exception_handlers(api_version).items())[::-1]:
-                    if isinstance(exception, exception_type):
-                        handler = exception_handler
-            return await handler(request=request, exception=exception, **kwargs)
+                content = await self.call_function()
+            return await self.render_content(content, request, response, **kwargs)
+
+        if not catches:
+            async def compiled(request, api_version=None, **kwargs):
+                api_version = int(api_version) if api_version is not None else api_version
+                return await endpoint(request, api_version, kwargs)
+        else:
+            async def compiled(request, api_version=None, **kwargs):
+                api_version = int(api_version) if api_version is not None else api_version
+                try:
+                    return await endpoint(request, api_version, kwargs)
+                except self.exception_types(api_version) as exception:
+                    return await self.handle_exception(exception, request, api_version, **kwargs)
+
+        # Sanic registers handlers by name, so every compiled handler is given its own
+        versions = '_'.join(str(version) for version in self.versions if version is not None) or 'any'
+        compiled.__name__ = compiled.__qualname__ = '{0}_v{1}_{2:x}'.format(self.interface.spec.__name__, versions,
+                                                                            id(self))
+        compiled.interface = self.interface
+        return compiled
 
     def documentation(self, add_to=None, version=None, base_url="", url=""):
         """Returns the documentation specific to an HTTP interface"""
@@ -31,10 +31,16 @@ from datetime import date, datetime
 from decimal import Decimal
 from functools import wraps
 from io import BytesIO
-from operator import itemgetter
+from operator import itemgetter, methodcaller
 
+import hug
 from hug import introspect
-from hug.format import camelcase, content_type
+from hug.format import camelcase, content_type, stream_framing
+
+try:  # pragma: no cover - optional faster JSON encoding backend
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 IMAGE_TYPES = ('png', 'jpg', 'bmp', 'eps', 'gif', 'im', 'jpeg', 'msp', 'pcx', 'ppm', 'spider', 'tiff', 'webp', 'xbm',
                'cur', 'dcx', 'fli', 'flc', 'gbr', 'gd', 'ico', 'icns', 'imt', 'iptc', 'naa', 'mcidas', 'mpo', 'pcd',
@@ -44,32 +50,56 @@ VIDEO_TYPES = (('flv', 'video/x-flv'), ('mp4', 'video/mp4'), ('m3u8', 'applicati
                ('3gp', 'video/3gpp'), ('mov', 'video/quicktime'), ('avi', 'video/x-msvideo'), ('wmv', 'video/x-ms-wmv'))
 RE_ACCEPT_QUALITY = re.compile("q=(?P<quality>[^;]+)")
 json_converters = {}
+json_converters_cache = {}
+json_encoders = {}
 stream = tempfile.NamedTemporaryFile if 'UWSGI_ORIGINAL_PROC_NAME' in os.environ else BytesIO
 
 
-def _json_converter(item):
-    if hasattr(item, '__native_types__'):
-        return item.__native_types__()
+def _decode_bytes(item):
+    try:
+        return item.decode('utf8')
+    except UnicodeDecodeError:
+        return base64.b64encode(item)
 
-    for kind, transformer in json_converters.items():
-        if isinstance(item, kind):
-            return transformer(item)
-
-    if isinstance(item, (date, datetime)):
-        return item.isoformat()
-    elif isinstance(item, bytes):
-        try:
-            return item.decode('utf8')
-        except UnicodeDecodeError:
-            return base64.b64encode(item)
-    elif hasattr(item, '__iter__'):
-        return list(item)
-    elif isinstance(item, Decimal):
-        return str(item)
 
+def _not_serializable(item):
     raise TypeError("Type not serializable")
 
 
+def _resolve_json_converter(kind):
+    """Returns the method used to convert instances of the given class, searching its MRO for a registered converter"""
+    if hasattr(kind, '__native_types__'):
+        return methodcaller('__native_types__')
+
+    for parent in kind.__mro__:
+        if parent in json_converters:
+            return json_converters[parent]
+
+    for converter_kind, transformer in json_converters.items():
+        if issubclass(kind, converter_kind):
+            return transformer
+
+    if issubclass(kind, (date, datetime)):
+        return methodcaller('isoformat')
+    elif issubclass(kind, bytes):
+        return _decode_bytes
+    elif hasattr(kind, '__iter__'):
+        return list
+    elif issubclass(kind, Decimal):
+        return str
+
+    return _not_serializable
+
+
+def _json_converter(item):
+    kind = type(item)
+    try:
+        converter = json_converters_cache[kind]
+    except KeyError:
+        converter = json_converters_cache[kind] = _resolve_json_converter(kind)
+    return converter(item)
+
+
 def json_convert(*kinds):
     """Registers the wrapped method as a JSON converter for the provided types.
 
@@ -78,10 +108,47 @@ def json_convert(*kinds):
     def register_json_converter(function):
         for kind in kinds:
             json_converters[kind] = function
+        json_converters_cache.clear()
         return function
     return register_json_converter
 
 
+def json_encoder(name):
+    """Registers the wrapped method as a named JSON encoding backend, which must return UTF-8 encoded bytes.
+
+    The active backend is selected by setting `hug.defaults.json_encoder` to one of `json_encoders`.
+    """
+    def register_json_encoder(function):
+        json_encoders[name] = function
+        return function
+    return register_json_encoder
+
+
+@json_encoder('json')
+def _stdlib_json(content, **kwargs):
+    return json_converter.dumps(content, default=_json_converter, **kwargs).encode('utf8')
+
+
+if orjson:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+    @json_encoder('orjson')
+    def _orjson(content, **kwargs):
+        """Encodes using orjson, handing whatever it would encode differently from the stdlib back to it
+
+           That is content orjson can't encode, such as integers wider than 64 bits, and output holding null, as
+           orjson writes NaN and Infinity as null where the stdlib writes them out.
+        """
+        if kwargs:
+            return _stdlib_json(content, **kwargs)
+        try:
+            output = orjson.dumps(content, default=_json_converter, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return _stdlib_json(content)
+        return _stdlib_json(content) if b'null' in output else output
+
+
+@stream_framing(b'[', b',', b']')
 @content_type('application/json')
 def json(content, **kwargs):
     """JSON (Javascript Serialized Object Notation)"""
@@ -90,7 +157,17 @@ def json(content, **kwargs):
 
     if isinstance(content, tuple) and getattr(content, '_fields', None):
         content = {field: getattr(content, field) for field in content._fields}
-    return json_converter.dumps(content, default=_json_converter, **kwargs).encode('utf8')
+    return hug.defaults.json_encoder(content, **kwargs)
+
+
+@stream_framing()
+@content_type('application/x-ndjson')
+def ndjson(content, **kwargs):
+    """Newline delimited JSON, with every item produced by a streamed iterator on its own line"""
+    if hasattr(content, 'read'):
+        return content
+
+    return json(content, **kwargs) + b'\n'
 
 
 def on_valid(valid_content_type, on_invalid=json):
@@ -101,10 +178,11 @@ def on_valid(valid_content_type, on_invalid=json):
     def wrapper(function):
         valid_kwargs = introspect.generate_accepted_kwargs(function, 'request', 'response')
         valid_takes_response = introspect.takes_all_arguments(function, 'response')
+        valid_takes_request = introspect.takes_all_arguments(function, 'request')
 
         @content_type(valid_content_type)
         @wraps(function)
-        def output_content(content, response, **kwargs):
+        def output_content(content, response, request=None, **kwargs):
             if type(content) == dict and 'errors' in content:
                 response.content_type = on_invalid.content_type
                 if invalid_takes_response:
@@ -113,6 +191,8 @@ def on_valid(valid_content_type, on_invalid=json):
 
             if valid_takes_response:
                 kwargs['response'] = response
+            if valid_takes_request:
+                kwargs['request'] = request
             return function(content, **valid_kwargs(kwargs))
         return output_content
     return wrapper
@@ -150,12 +230,14 @@ def _camelcase(dictionary):
     return new_dictionary
 
 
+@stream_framing(b'[', b',', b']')
 @content_type('application/json')
 def json_camelcase(content):
     """JSON (Javascript Serialized Object Notation) with all keys camelCased"""
     return json(_camelcase(content))
 
 
+@stream_framing(b'[', b',', b']')
 @content_type('application/json')
 def pretty_json(content):
     """JSON (Javascript Serialized Object Notion) pretty printed and indented"""
@@ -165,7 +247,7 @@ def pretty_json(content):
 def image(image_format, doc=None):
     """Dynamically creates an image type handler for the specified image type"""
     @on_valid('image/{0}'.format(image_format))
-    def image_handler(data):
+    def image_handler(data, request=None, response=None):
         if hasattr(data, 'read'):
             return data
         elif hasattr(data, 'save'):
@@ -179,6 +261,8 @@ def image(image_format, doc=None):
         elif hasattr(data, 'render'):
             return data.render()
         elif os.path.isfile(data):
+            if request is not None and hug.conditional.check(data, request, response, hug.defaults.hash_file_etags):
+                return b''
             return open(data, 'rb')
 
     image_handler.__doc__ = doc or "{0} formatted image".format(image_format)
@@ -192,7 +276,7 @@ for image_type in IMAGE_TYPES:
 def video(video_type, video_mime, doc=None):
     """Dynamically creates a video type handler for the specified video type"""
     @on_valid(video_mime)
-    def video_handler(data):
+    def video_handler(data, request=None, response=None):
         if hasattr(data, 'read'):
             return data
         elif hasattr(data, 'save'):
@@ -203,6 +287,8 @@ def video(video_type, video_mime, doc=None):
         elif hasattr(data, 'render'):
             return data.render()
         elif os.path.isfile(data):
+            if request is not None and hug.conditional.check(data, request, response, hug.defaults.hash_file_etags):
+                return b''
             return open(data, 'rb')
 
     video_handler.__doc__ = doc or "{0} formatted video".format(video_type)
@@ -214,12 +300,19 @@ for (video_type, video_mime) in VIDEO_TYPES:
 
 
 @on_valid('file/dynamic')
-def file(data, response):
+def file(data, response, request=None):
     """A dynamically retrieved file"""
     if hasattr(data, 'read'):
         name, data = getattr(data, 'name', ''), data
+        stat = getattr(data, 'stat', None)
+        if request is not None and stat is not None and \
+           hug.conditional.check(name, request, response, hug.defaults.hash_file_etags, stat):
+            data = b''
     elif os.path.isfile(data):
-        name, data = data, open(data, 'rb')
+        if request is not None and hug.conditional.check(data, request, response, hug.defaults.hash_file_etags):
+            name, data = data, b''
+        else:
+            name, data = data, open(data, 'rb')
     else:
         response.content_type = 'text/plain'
         response.set_status(404)
@@ -0,0 +1,116 @@
+"""hug/ranges.py
+
+Defines the HTTP Range request (RFC 7233) handling hug uses when sending files
+
+Copyright (C) 2016  Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+from __future__ import absolute_import
+
+import re
+import uuid
+from email.utils import parsedate_to_datetime
+
+MAX_RANGES = 16
+RANGE_SPECIFIER = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header is valid, but none of the ranges it requests overlap the representation"""
+    pass
+
+
+def parse(header, size, max_ranges=MAX_RANGES):
+    """Returns the sorted, coalesced, inclusive (first, last) byte positions requested by a Range header
+
+       None is returned when the header should be ignored, and so the full representation sent, because it is
+       malformed, uses a unit other than bytes, or requests more than max_ranges ranges.
+       RangeNotSatisfiable is raised when none of the requested ranges overlap the size bytes available.
+    """
+    unit, _, specifiers = header.partition('=')
+    if unit.strip().lower() != 'bytes':
+        return None
+
+    specifiers = specifiers.split(',')
+    if len(specifiers) > max_ranges:
+        return None
+
+    ranges = []
+    for specifier in specifiers:
+        match = RANGE_SPECIFIER.match(specifier)
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+
+        first, last = match.groups()
+        if not first:
+            suffix_length = int(last)
+            if suffix_length and size:
+                ranges.append((max(size - suffix_length, 0), size - 1))
+            continue
+
+        first, last = int(first), int(last) if last else None
+        if last is not None and last < first:
+            return None
+        if first < size:
+            ranges.append((first, size - 1 if last is None else min(last, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable(header)
+
+    ranges.sort()
+    coalesced = [ranges[0]]
+    for first, last in ranges[1:]:
+        previous_first, previous_last = coalesced[-1]
+        if first <= previous_last + 1:
+            coalesced[-1] = (previous_first, max(last, previous_last))
+        else:
+            coalesced.append((first, last))
+    return coalesced
+
+
+def if_range(header, entity_tag, modified):
+    """Returns True if a Range request should be honoured given the value of its If-Range header
+
+       Entity tags must match the current one exactly (weak tags never do), and dates must exactly match the
+       modification time of the representation.
+    """
+    if not header:
+        return True
+
+    header = header.strip()
+    if header.startswith('"'):
+        return header == entity_tag
+    elif header.startswith('W/'):
+        return False
+
+    try:
+        return int(parsedate_to_datetime(header).timestamp()) == int(modified)
+    except (TypeError, ValueError, IndexError):
+        return False
+
+
+def multipart(ranges, size, content_type):
+    """Returns the boundary, the (part header, first, last) of every part, and the closing delimiter of the
+       multipart/byteranges body sending the provided ranges
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for first, last in ranges:
+        header = '\r\n--{0}\r\nContent-Type: {1}\r\nContent-Range: bytes {2}-{3}/{4}\r\n\r\n'.format(
+            boundary, content_type, first, last, size)
+        parts.append((header.encode('ascii'), first, last))
+    return boundary, parts, '\r\n--{0}--\r\n'.format(boundary).encode('ascii')
@@ -0,0 +1,215 @@
+"""hug/route_tree.py
+
+Defines hug's compiled URL router: a tree over path segments with typed parameter captures, and method / version
+dispatch at its leaves, served through a single catch-all handler
+
+Copyright (C) 2016  Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+from __future__ import absolute_import
+
+import re
+
+import sanic
+
+PARAMETER = re.compile(r'^(?:<(\w+)(?::(\w+))?>|\{(\w+)(?::(\w+))?\})$')
+VERSION = re.compile(r'^v(\d+)$')
+INTEGER = re.compile(r'^-?\d+$')
+NUMBER = re.compile(r'^-?\d+(?:\.\d+)?$')
+
+
+def _integer(segment):
+    if not INTEGER.match(segment):
+        raise ValueError(segment)
+    return int(segment)
+
+
+def _number(segment):
+    if not NUMBER.match(segment):
+        raise ValueError(segment)
+    return float(segment)
+
+
+def _string(segment):
+    return segment
+
+
+CONVERTERS = {'int': (0, _integer), 'float': (1, _number), 'number': (1, _number), 'str': (2, _string),
+              'string': (2, _string)}
+
+
+class Node(object):
+    """A single path segment within a RouteTree"""
+    __slots__ = ('static', 'parameters', 'catch_all', 'methods')
+
+    def __init__(self):
+        self.static = {}
+        self.parameters = []
+        self.catch_all = None
+        self.methods = None
+
+
+class RouteTree(object):
+    """Matches request paths against every registered URL at once, by walking a tree of their segments
+
+       Static segments are preferred over typed parameters (`<name:int>`, `<name:float>`), which are preferred over
+       untyped ones (`<name>`), which are preferred over a trailing `<name:path>` that captures the rest of the path.
+       Both `<name:type>` and `{name:type}` placeholders are accepted.
+       A leading `/vN` segment selects the API version N, for any of the provided versions.
+    """
+    __slots__ = ('root', 'versions')
+
+    def __init__(self, versions=()):
+        self.root = Node()
+        self.versions = set(version for version in versions if version is not None)
+
+    def add(self, url, method, version, handler):
+        """Registers the handler for requests to url using the given HTTP method and API version"""
+        node = self.root
+        segments = [segment for segment in url.split('/') if segment]
+        for index, segment in enumerate(segments):
+            parameter = PARAMETER.match(segment)
+            if not parameter:
+                node = node.static.setdefault(segment, Node())
+                continue
+
+            name = parameter.group(1) or parameter.group(3)
+            kind = parameter.group(2) or parameter.group(4) or 'str'
+            if kind == 'path':
+                if index != len(segments) - 1:
+                    raise ValueError('Path parameters must be the last segment of a URL: {0}'.format(url))
+                if node.catch_all is None:
+                    node.catch_all = (name, Node())
+                elif node.catch_all[0] != name:
+                    raise ValueError('Conflicting path parameter names for URL: {0}'.format(url))
+                node = node.catch_all[1]
+                continue
+
+            if kind not in CONVERTERS:
+                raise ValueError('Unknown URL parameter type "{0}" in URL: {1}'.format(kind, url))
+            priority, converter = CONVERTERS[kind]
+            for existing_priority, existing_name, existing_converter, child in node.parameters:
+                if existing_name == name and existing_converter is converter:
+                    node = child
+                    break
+            else:
+                child = Node()
+                node.parameters.append((priority, name, converter, child))
+                node.parameters.sort(key=lambda parameter: parameter[0])
+                node = child
+
+        if node.methods is None:
+            node.methods = {}
+        node.methods.setdefault(method.upper(), {})[version] = handler
+        if version is not None:
+            self.versions.add(version)
+
+    def match(self, path):
+        """Returns the {method: {version: handler}} registered for the path, along with its URL parameters
+
+           (None, None) is returned if no registered URL matches the path.
+        """
+        segments = [segment for segment in path.split('/') if segment]
+        parameters = {}
+        node = self._match(self.root, segments, 0, parameters)
+        if node is None:
+            return None, None
+        return node.methods, parameters
+
+    def _match(self, node, segments, index, parameters):
+        if index == len(segments):
+            return node if node.methods is not None else None
+
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._match(child, segments, index + 1, parameters)
+            if found is not None:
+                return found
+
+        for priority, name, converter, child in node.parameters:
+            try:
+                value = converter(segment)
+            except ValueError:
+                continue
+            found = self._match(child, segments, index + 1, parameters)
+            if found is not None:
+                parameters[name] = value
+                return found
+
+        if node.catch_all is not None:
+            name, child = node.catch_all
+            if child.methods is not None:
+                parameters[name] = '/'.join(segments[index:])
+                return child
+        return None
+
+    def resolve(self, method, path, requested_version=None):
+        """Returns the (handler, api_version, URL parameters) that should serve a request, or None if there are none
+
+           requested_version is a version asked for outside of the path, such as through a header, and must agree with
+           any `/vN` prefix of the path. Versions the tree doesn't know are served by the unversioned handler, if any.
+           Raises HTTPBadRequest if the two conflict, and HTTPMethodNotAllowed if the path matches a registered URL, but
+           not for the requested method.
+        """
+        version = None
+        methods, parameters = None, None
+        prefix = path.lstrip('/').split('/', 1)
+        version_match = VERSION.match(prefix[0])
+        if version_match and int(version_match.group(1)) in self.versions:
+            version = int(version_match.group(1))
+            methods, parameters = self.match(prefix[1] if len(prefix) > 1 else '')
+        if methods is None:
+            version = None
+            methods, parameters = self.match(path)
+            if methods is None:
+                return None
+
+        if requested_version is not None:
+            if version is not None and version != requested_version:
+                raise sanic.web.HTTPBadRequest(text='You are requesting conflicting versions')
+            if requested_version in self.versions:
+                version = requested_version
+
+        handlers = methods.get(method)
+        if handlers is None:
+            raise sanic.web.HTTPMethodNotAllowed(method, list(methods))
+
+        if version is None:
+            handler = handlers.get(None)
+            if handler is None:
+                return None
+        else:
+            handler = handlers.get(version) or handlers.get(None) or next(iter(handlers.values()))
+        return handler, version, parameters
+
+    def handler(self, not_found=None, determine_version=None):
+        """Returns a single catch-all request handler that dispatches every request through this tree
+
+           determine_version, if provided, is called with each request to find any version it asks for beyond its path.
+        """
+        async def dispatch(request, *args, **kwargs):
+            requested_version = determine_version(request) if determine_version else None
+            resolved = self.resolve(request.method, request.path, requested_version)
+            if resolved is None:
+                if not_found is None:
+                    raise sanic.web.HTTPNotFound()
+                return await not_found(request)
+
+            handler, version, parameters = resolved
+            return await handler(request, api_version=version, **parameters)
+        return dispatch
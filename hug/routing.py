@@ -30,6 +30,7 @@ from functools import wraps
 from hug.settings import HTTP_METHODS
 
 import hug.api
+import hug.cache
 import hug.interface
 import hug.output_format
 from hug import introspect
@@ -139,7 +140,7 @@ class HTTPRouter(InternalValidation):
     __slots__ = ()
 
     def __init__(self, versions=None, parse_body=False, parameters=None, defaults={}, status=None,
-                 response_headers=None, private=False, **kwargs):
+                 response_headers=None, private=False, compress=None, transform_items=False, **kwargs):
         super().__init__(**kwargs)
         self.route['versions'] = (versions,) if isinstance(versions, (int, float, None.__class__)) else versions
         if parse_body:
@@ -154,6 +155,10 @@ class HTTPRouter(InternalValidation):
             self.route['response_headers'] = response_headers
         if private:
             self.route['private'] = private
+        if compress is not None:
+            self.route['compress'] = compress
+        if transform_items:
+            self.route['transform_items'] = transform_items
 
     def versions(self, supported, **overrides):
         """Sets the versions that this route should be compatiable with"""
@@ -197,6 +202,18 @@ class HTTPRouter(InternalValidation):
                  no_store and 'no-store', must_revalidate and 'must-revalidate')
         return self.add_response_headers({'cache-control': ', '.join(filter(bool, parts))}, **overrides)
 
+    def compress(self, compression=True, **overrides):
+        """Sets how the responses of this route are compressed, overriding the API wide `api.http.compression`
+
+           Accepts True to use the default settings, a dict of hug.compression.Compression arguments or an instance of
+           it, or False to never compress responses of this route.
+        """
+        return self.where(compress=compression, **overrides)
+
+    def transform_items(self, setting=True, **overrides):
+        """Sets the route to transform every item of a streamed (iterator) result, instead of the result as a whole"""
+        return self.where(transform_items=setting, **overrides)
+
     def allow_origins(self, *origins, methods=None, **overrides):
         """Convience method for quickly allowing other resources to access this one"""
         headers = {'Access-Control-Allow-Origin': ', '.join(origins) if origins else '*'}
@@ -242,12 +259,24 @@ class StaticRouter(SinkRouter):
     """Provides a chainable router that can be used to return static files automatically from a set of directories"""
     __slots__ = ('route',)
 
-    def __init__(self, urls=None, output=hug.output_format.file, cache=False, **kwargs):
+    def __init__(self, urls=None, output=hug.output_format.file, cache=False, file_cache=False, **kwargs):
         super().__init__(urls=urls, output=output, **kwargs)
         if cache is True:
             self.cache()
         elif cache is not False:
             self.cache(**cache)
+        if file_cache:
+            self.route['file_cache'] = file_cache
+
+    def file_cache(self, max_entries=1024, max_bytes=16777216, max_file_size=262144, check_interval=1.0,
+                   **overrides):
+        """Caches what requested paths resolve to, and the contents of small files, in a size bounded LRU
+
+           Cached files are revalidated against their modification time, size, and inode at most once every
+           check_interval seconds.
+        """
+        return self.where(file_cache={'max_entries': max_entries, 'max_bytes': max_bytes,
+                                      'max_file_size': max_file_size, 'check_interval': check_interval}, **overrides)
 
     def __call__(self, api_function):
         directories = []
@@ -257,20 +286,28 @@ class StaticRouter(SinkRouter):
             )
             directories.append(path)
 
+        def resolve(filename):
+            for directory in directories:
+                path = os.path.join(directory, filename)
+                if os.path.isdir(path):
+                    new_path = os.path.join(path, "index.html")
+                    if os.path.exists(new_path) and os.path.isfile(new_path):
+                        path = new_path
+                if os.path.exists(path) and os.path.isfile(path):
+                    return path
+
+        file_cache = self.route.get('file_cache')
+        if file_cache:
+            file_cache = hug.cache.FileCache(**file_cache) if isinstance(file_cache, dict) else hug.cache.FileCache()
+
         api = self.route.get('api', hug.api.from_object(api_function))
         for base_url in self.route.get('urls', ("/{0}".format(api_function.__name__),)):
             def read_file(request=None, path=""):
                 filename = path.lstrip("/")
-                for directory in directories:
-                    path = os.path.join(directory, filename)
-                    if os.path.isdir(path):
-                        new_path = os.path.join(path, "index.html")
-                        if os.path.exists(new_path) and os.path.isfile(new_path):
-                            path = new_path
-                    if os.path.exists(path) and os.path.isfile(path):
-                        return path
-
-                hug.redirect.not_found()
+                path = file_cache.get(filename, resolve) if file_cache else resolve(filename)
+                if path is None:
+                    hug.redirect.not_found()
+                return path
 
             api.http.add_sink(self._create_interface(api, read_file)[0], base_url)
         return api_function
@@ -0,0 +1,254 @@
+"""hug/tokens.py
+
+Defines the signed (JWT, HMAC SHA-2) tokens hug can issue and verify, along with the rotating key sets used to do so
+
+Copyright (C) 2016  Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+from __future__ import absolute_import
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import time
+
+import hug.cache
+from hug.exceptions import InvalidToken
+from hug.settings import config
+
+ALGORITHMS = {'HS256': hashlib.sha256, 'HS384': hashlib.sha384, 'HS512': hashlib.sha512}
+
+
+def encode_segment(data):
+    """Returns data encoded as an unpadded URL safe base64 token segment"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def decode_segment(segment):
+    """Returns the bytes encoded within an unpadded URL safe base64 token segment"""
+    try:
+        return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+    except (binascii.Error, ValueError):
+        raise InvalidToken('Token segment is improperly encoded')
+
+
+class KeySet(object):
+    """The secret keys tokens are signed with, identified by their key ids
+
+       Tokens are signed with the current key, and verified with whichever key they name, so that keys can be
+       rotated without invalidating tokens issued before the rotation. A keyed HMAC is prepared once per key and
+       algorithm, and copied for every token, instead of being derived from the key every time.
+    """
+    __slots__ = ('keys', 'current', 'algorithm', 'generation', '_prepared')
+
+    def __init__(self, keys, current=None, algorithm='HS256'):
+        if algorithm not in ALGORITHMS:
+            raise ValueError('Unsupported token algorithm: {0}'.format(algorithm))
+        self.algorithm = algorithm
+        self.generation = 0
+        self.update(keys if isinstance(keys, dict) else {'default': keys}, current)
+
+    def update(self, keys, current=None):
+        """Replaces the keys of this set, keeping a current key to sign with"""
+        if not keys:
+            raise ValueError('A key set needs at least one key')
+        self.keys = {kid: key.encode('utf8') if isinstance(key, str) else key for kid, key in keys.items()}
+        self.current = current if current in self.keys else sorted(self.keys)[-1]
+        self._prepared = {}
+        self.generation += 1
+
+    def signature(self, kid, algorithm, signing_input):
+        """Returns the signature of signing_input using the identified key and algorithm"""
+        prepared = self._prepared.get((kid, algorithm))
+        if prepared is None:
+            prepared = self._prepared[(kid, algorithm)] = hmac.new(self.keys[kid], digestmod=ALGORITHMS[algorithm])
+        signer = prepared.copy()
+        signer.update(signing_input)
+        return signer.digest()
+
+    def sign(self, claims, kid=None, algorithm=None):
+        """Returns a token carrying the claims, signed using the identified key or the current one"""
+        kid = kid or self.current
+        algorithm = algorithm or self.algorithm
+        header = encode_segment(json.dumps({'alg': algorithm, 'typ': 'JWT', 'kid': kid},
+                                           separators=(',', ':')).encode('utf8'))
+        payload = encode_segment(json.dumps(claims, separators=(',', ':')).encode('utf8'))
+        signing_input = '{0}.{1}'.format(header, payload).encode('ascii')
+        return '{0}.{1}.{2}'.format(header, payload, encode_segment(self.signature(kid, algorithm, signing_input)))
+
+    def verify(self, token, leeway=0):
+        """Returns the claims carried by a token after verifying its signature and validity period
+
+           Raises InvalidToken if the token can't be trusted.
+        """
+        self.refresh()
+        try:
+            header, payload, signature = token.split('.')
+        except ValueError:
+            raise InvalidToken('Token is improperly formed')
+
+        try:
+            header_data = json.loads(decode_segment(header).decode('utf8'))
+            algorithm = header_data['alg']
+        except (ValueError, KeyError, TypeError):
+            raise InvalidToken('Token header is improperly formed')
+        if algorithm not in ALGORITHMS:
+            raise InvalidToken('Token algorithm is not supported')
+
+        kid = header_data.get('kid')
+        kids = (kid, ) if kid is not None else tuple(self.keys)
+        if kid is not None and kid not in self.keys:
+            raise InvalidToken('Token was signed with an unknown key')
+
+        signing_input = '{0}.{1}'.format(header, payload).encode('ascii')
+        signature = decode_segment(signature)
+        if not any(hmac.compare_digest(self.signature(key_id, algorithm, signing_input), signature)
+                   for key_id in kids):
+            raise InvalidToken('Token signature is invalid')
+
+        try:
+            claims = json.loads(decode_segment(payload).decode('utf8'))
+        except ValueError:
+            raise InvalidToken('Token claims are improperly formed')
+        if not isinstance(claims, dict):
+            raise InvalidToken('Token claims are improperly formed')
+
+        for claim in ('exp', 'nbf'):
+            if claim in claims and (type(claims[claim]) not in (int, float)):
+                raise InvalidToken('Token {0} claim must be a number'.format(claim))
+
+        now = time.time()
+        if 'exp' in claims and now - leeway >= claims['exp']:
+            raise InvalidToken('Token has expired')
+        if 'nbf' in claims and now + leeway < claims['nbf']:
+            raise InvalidToken('Token is not valid yet')
+        return claims
+
+    def refresh(self):
+        """Reloads the keys of the set from where they are stored, if they are stored anywhere"""
+        pass
+
+
+class FileKeySet(KeySet):
+    """A key set loaded from a directory holding one key file per key id, named after it
+
+       The directory is checked for added, removed, or changed keys at most once every check_interval seconds, so
+       keys can be rotated by replacing files. The current key is the one named in a `current` file, if present,
+       and otherwise the last key id in sorted order.
+    """
+    __slots__ = ('path', 'check_interval', 'checked', 'version')
+
+    def __init__(self, path, algorithm='HS256', check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.checked = time.monotonic()
+        self.version = self._version()
+        super().__init__(self._load(), self._current(), algorithm)
+
+    def refresh(self):
+        now = time.monotonic()
+        if now - self.checked < self.check_interval:
+            return
+        self.checked = now
+
+        version = self._version()
+        if version != self.version:
+            self.version = version
+            self.update(self._load(), self._current())
+
+    def _version(self):
+        return tuple(sorted((entry.name, entry.stat().st_mtime, entry.stat().st_size)
+                            for entry in os.scandir(self.path) if entry.is_file()))
+
+    def _load(self):
+        keys = {}
+        for entry in os.scandir(self.path):
+            if entry.is_file() and entry.name != 'current' and not entry.name.startswith('.'):
+                with open(entry.path, 'rb') as key_file:
+                    keys[entry.name] = key_file.read().strip()
+        return keys
+
+    def _current(self):
+        try:
+            with open(os.path.join(self.path, 'current')) as current_file:
+                return current_file.read().strip()
+        except OSError:
+            return None
+
+
+def configured_secret():
+    """Returns the TOKEN_SECRET_KEY set in settings.yaml, or the environment, in that order"""
+    return config.get('TOKEN_SECRET_KEY') or os.environ.get('TOKEN_SECRET_KEY')
+
+
+def default_key_set():
+    """Returns a key set holding the configured TOKEN_SECRET_KEY"""
+    secret = configured_secret()
+    if not secret:
+        raise ValueError('TOKEN_SECRET_KEY must be configured to sign or verify tokens without a key set')
+    return KeySet(secret)
+
+
+class Claims(dict):
+    """The claims of a verified token, which are truthy even when empty, so that they always authenticate"""
+    __slots__ = ()
+
+    def __bool__(self):
+        return True
+
+
+class Verifier(object):
+    """Verifies tokens against a key set, remembering the claims of tokens already verified until they expire
+
+       The same Claims dictionary is returned every time a remembered token is verified, and shouldn't be modified.
+    """
+    __slots__ = ('key_set', 'leeway', 'max_age', 'scheme', 'verified', 'generation')
+
+    def __init__(self, key_set=None, cache_entries=4096, leeway=0, max_age=300.0, scheme='Bearer'):
+        self.key_set = key_set or default_key_set()
+        self.leeway = leeway
+        self.max_age = max_age
+        self.scheme = scheme
+        self.verified = hug.cache.TTL(cache_entries, max_age)
+        self.generation = self.key_set.generation
+
+    def __call__(self, token):
+        """Returns the claims of a valid token, or None if it isn't one"""
+        if self.scheme and token[:len(self.scheme) + 1].lower() == self.scheme.lower() + ' ':
+            token = token[len(self.scheme) + 1:].strip()
+
+        self.key_set.refresh()
+        if self.key_set.generation != self.generation:
+            self.verified.clear()
+            self.generation = self.key_set.generation
+
+        claims = self.verified.get(token)
+        if claims is not None:
+            return claims
+
+        try:
+            claims = Claims(self.key_set.verify(token, self.leeway))
+        except InvalidToken:
+            return None
+
+        ttl = self.max_age
+        if 'exp' in claims:
+            ttl = min(ttl, claims['exp'] + self.leeway - time.time())
+        return self.verified.set(token, claims, ttl=ttl)
@@ -21,19 +21,31 @@ OTHER DEALINGS IN THE SOFTWARE.
 """
 from __future__ import absolute_import
 
+import re
 import uuid as native_uuid
 from decimal import Decimal
 from json import loads as load_json
 
 import hug._empty as empty
+from hug.cache import LRU
 from hug.exceptions import InvalidTypeData
 
+try:  # pragma: no cover - numpy is an optional dependency
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+NUMPY_DTYPES = {int: 'int64', float: 'float64'}
+WHOLE_NUMBER = re.compile(r'^\s*[-+]?[\d_]+\s*$')
+_UNKNOWN = object()
+
 
 class Type(object):
     """Defines the base hug concept of a type for use in function annotation.
        Override `__call__` to define how the type should be transformed and validated
     """
     _hug_type = True
+    pure = False
     __slots__ = ()
 
     def __init__(self, **kwargs):
@@ -42,8 +54,67 @@ class Type(object):
     def __call__(self, value):
         raise NotImplementedError('To implement a new type __call__ must be defined')
 
+    def accepts(self, value):
+        """Returns False if the value certainly can't be converted by this type, without attempting to convert it
+
+           Override alongside `__call__` with a cheap check, so that `Multi` can skip types a value isn't meant for.
+        """
+        return True
+
+    def batch(self, values):
+        """Converts and validates a whole list of values at once, raising InvalidTypeData with any errors by index"""
+        try:
+            return list(map(self, values))
+        except Exception:
+            return _convert_each(self, values)
+
+
+def _error_message(error):
+    if isinstance(error, InvalidTypeData):
+        return error.reasons or str(error.message)
+    return error.args[0] if getattr(error, 'args', None) else str(error)
+
+
+def _convert_each(type_handler, values):
+    converted = []
+    errors = {}
+    for index, value in enumerate(values):
+        try:
+            converted.append(type_handler(value))
+        except Exception as error:
+            errors[index] = _error_message(error)
+    if errors:
+        raise InvalidTypeData('Invalid values provided', errors)
+    return converted
+
+
+def _batch(type_handler, values):
+    batch = getattr(type_handler, 'batch', None)
+    if batch is not None:
+        return batch(values)
+    try:
+        return list(map(type_handler, values))
+    except Exception:
+        return _convert_each(type_handler, values)
+
+
+def _bounded(type_handler, values, within):
+    try:
+        converted = _batch(type_handler.convert, values)
+        if not len(converted):
+            return converted
+        if numpy is not None and isinstance(converted, numpy.ndarray):
+            if within(converted.min(), converted.max()):
+                return converted
+        elif within(min(converted), max(converted)):
+            return converted
+    except InvalidTypeData:
+        pass
+    return _convert_each(type_handler, values)
+
 
-def create(doc=None, error_text=None, exception_handlers=empty.dict, extend=Type, chain=True):
+def create(doc=None, error_text=None, exception_handlers=empty.dict, extend=Type, chain=True, pure=False,
+           accepts=None):
     """Creates a new type handler with the specified type-casting handler"""
     extend = extend if type(extend) == type else type(extend)
 
@@ -90,25 +161,52 @@ def create(doc=None, error_text=None, exception_handlers=empty.dict, extend=Type
                     def __call__(self, value):
                         return function(value)
 
+                def batch(self, values):
+                    if type(self).__call__ is not NewType.__call__:
+                        return Type.batch(self, values)
+                    try:
+                        if numpy is not None and isinstance(values, numpy.ndarray) and function in NUMPY_DTYPES:
+                            return values.astype(NUMPY_DTYPES[function])
+                        return list(map(function, values))
+                    except Exception:
+                        return _convert_each(self, values)
+
         NewType.__doc__ = function.__doc__ if doc is None else doc
+        NewType.pure = pure
+        if accepts is not None:
+            NewType.accepts = lambda self, value: accepts(value)
         return NewType
 
     return new_type_handler
 
 
-def accept(kind, doc=None, error_text=None, exception_handlers=empty.dict):
+def accept(kind, doc=None, error_text=None, exception_handlers=empty.dict, pure=False, accepts=None):
     """Allows quick wrapping of any Python type cast function for use as a hug type annotation"""
-    return create(doc, error_text, exception_handlers=exception_handlers, chain=False)(kind)()
+    return create(doc, error_text, exception_handlers=exception_handlers, chain=False, pure=pure,
+                  accepts=accepts)(kind)()
+
+
+def _whole_number_like(value):
+    return not isinstance(value, str) or bool(WHOLE_NUMBER.match(value))
+
 
-number = accept(int, 'A Whole number', 'Invalid whole number provided')
-float_number = accept(float, 'A float number', 'Invalid float number provided')
-decimal = accept(Decimal, 'A decimal number', 'Invalid decimal number provided')
-boolean = accept(bool, 'Providing any value will set this to true', 'Invalid boolean value provided')
-uuid = accept(native_uuid.UUID, 'A Universally Unique IDentifier', 'Invalid UUID provided')
+def _uuid_like(value):
+    if not isinstance(value, str):
+        return True
+    return len(value.replace('urn:', '').replace('uuid:', '').strip('{}').replace('-', '')) == 32
+
+
+number = accept(int, 'A Whole number', 'Invalid whole number provided', pure=True, accepts=_whole_number_like)
+float_number = accept(float, 'A float number', 'Invalid float number provided', pure=True)
+decimal = accept(Decimal, 'A decimal number', 'Invalid decimal number provided', pure=True)
+boolean = accept(bool, 'Providing any value will set this to true', 'Invalid boolean value provided', pure=True)
+uuid = accept(native_uuid.UUID, 'A Universally Unique IDentifier', 'Invalid UUID provided', pure=True,
+              accepts=_uuid_like)
 
 
 class Text(Type):
     """Basic text / string value"""
+    pure = True
     __slots__ = ()
 
     def __call__(self, value):
@@ -116,22 +214,38 @@ class Text(Type):
             raise ValueError('Invalid text value provided')
         return str(value)
 
+    def accepts(self, value):
+        return not (type(value) in (list, tuple) or value is None)
+
 text = Text()
 
 
 class Multiple(Type):
     """Multiple Values"""
-    __slots__ = ()
+    __slots__ = ('of', 'array')
+
+    def __init__(self, of=None, array=False):
+        self.of = of
+        self.array = array
+
+    def convert(self, values):
+        """Converts every one of the values using the type handler provided as of, all in one batch"""
+        if self.of is None:
+            return values
+        if self.array and numpy is not None:
+            values = numpy.asarray(values)
+        return _batch(self.of, values)
 
     def __call__(self, value):
-        return value if isinstance(value, list) else [value]
+        return self.convert(value if isinstance(value, list) else [value])
 
 
 class DelimitedList(Multiple):
     """Defines a list type that is formed by delimiting a list with a certain character or set of characters"""
     __slots__ = ('using', )
 
-    def __init__(self, using=","):
+    def __init__(self, using=",", of=None, array=False):
+        super().__init__(of, array)
         self.using = using
 
     @property
@@ -139,11 +253,12 @@ class DelimitedList(Multiple):
         return '''Multiple values, separated by "{0}"'''.format(self.using)
 
     def __call__(self, value):
-        return value if type(value) in (list, tuple) else value.split(self.using)
+        return self.convert(value if type(value) in (list, tuple) else value.split(self.using))
 
 
 class SmartBoolean(type(boolean)):
     """Accepts a true or false value"""
+    pure = True
     __slots__ = ()
 
     def __call__(self, value):
@@ -169,37 +284,64 @@ class InlineDictionary(Type):
 
 class OneOf(Type):
     """Ensures the value is within a set of acceptable values"""
-    __slots__ = ('values', )
+    pure = True
+    __slots__ = ('values', 'accepted', 'documentation', 'error_text')
 
     def __init__(self, values):
         self.values = values
+        self.accepted = _frozen(values)
+        self.documentation = 'Accepts one of the following values: ({0})'.format(_joined(values))
+        self.error_text = 'Invalid value passed. The accepted values are: ({0})'.format(_joined(values))
 
     @property
     def __doc__(self):
-        return 'Accepts one of the following values: ({0})'.format("|".join(self.values))
+        return self.documentation
 
     def __call__(self, value):
-        if not value in self.values:
-            raise KeyError('Invalid value passed. The accepted values are: ({0})'.format("|".join(self.values)))
+        try:
+            accepted = value in self.accepted
+        except TypeError:
+            accepted = False
+        if not accepted:
+            raise KeyError(self.error_text)
         return value
 
+    def accepts(self, value):
+        try:
+            return value in self.accepted
+        except TypeError:
+            return False
+
 
 class Mapping(OneOf):
     """Ensures the value is one of an acceptable set of values mapping those values to a Python equivelent"""
     __slots__ = ('value_map', )
 
     def __init__(self, value_map):
-        self.value_map = value_map
-        self.values = value_map.keys()
+        super().__init__(value_map.keys())
+        self.value_map = dict(value_map)
+        self.accepted = self.value_map
 
     @property
     def __doc__(self):
-        return 'Accepts one of the following values: ({0})'.format("|".join(self.values))
+        return self.documentation
 
     def __call__(self, value):
-        if not value in self.values:
-            raise KeyError('Invalid value passed. The accepted values are: ({0})'.format("|".join(self.values)))
-        return self.value_map[value]
+        try:
+            return self.value_map[value]
+        except (KeyError, TypeError):
+            raise KeyError(self.error_text)
+
+
+def _frozen(values):
+    try:
+        return frozenset(values)
+    except TypeError:
+        return tuple(values)
+
+
+def _joined(values):
+    return "|".join(value if isinstance(value, str) else str(value) for value in values)
 
 
 class JSON(Type):
@@ -229,12 +371,25 @@ class Multi(Type):
         return 'Accepts any of the following value types:{0}\n'.format('\n  - '.join(type_strings))
 
     def __call__(self, value):
+        errors = []
+        skipped = []
         for type_method in self.types:
+            accepts = getattr(type_method, 'accepts', None)
+            if accepts is not None and not accepts(value):
+                skipped.append(len(errors))
+                errors.append(type_method)
+                continue
             try:
                 return type_method(value)
-            except:
-                pass
-        raise ValueError(self.__doc__)
+            except Exception as error:
+                errors.append(_error_message(error))
+
+        for index in skipped:  # types skipped up front still give the reason they don't accept the value
+            try:
+                return errors[index](value)
+            except Exception as error:
+                errors[index] = _error_message(error)
+        raise InvalidTypeData(self.__doc__, errors)
 
 
 class InRange(Type):
@@ -259,6 +414,9 @@ class InRange(Type):
             raise ValueError("'{0}' reaches the limit of {1}".format(value, self.upper))
         return value
 
+    def batch(self, values):
+        return _bounded(self, values, lambda lowest, highest: lowest >= self.lower and highest < self.upper)
+
 
 class LessThan(Type):
     """Accepts a number within a lower and upper bound of acceptable values"""
@@ -278,6 +436,9 @@ class LessThan(Type):
             raise ValueError("'{0}' must be less than {1}".format(value, self.limit))
         return value
 
+    def batch(self, values):
+        return _bounded(self, values, lambda lowest, highest: highest < self.limit)
+
 
 class GreaterThan(Type):
     """Accepts a value above a given minimum"""
@@ -297,6 +458,9 @@ class GreaterThan(Type):
             raise ValueError("'{0}' must be greater than {1}".format(value, self.minimum))
         return value
 
+    def batch(self, values):
+        return _bounded(self, values, lambda lowest, highest: lowest > self.minimum)
+
 
 class Length(Type):
     """Accepts a a value that is withing a specific length limit"""
@@ -390,6 +554,15 @@ class Chain(Type):
             value = type_function(value)
         return value
 
+    def batch(self, values):
+        converted = values
+        try:
+            for type_function in self.types:
+                converted = _batch(type_function, converted)
+        except InvalidTypeData:
+            return _convert_each(self, values)
+        return converted
+
 
 class Nullable(Chain):
     """A Chain types that Allows None values"""
@@ -404,6 +577,9 @@ class Nullable(Chain):
         else:
             return super(Nullable, self).__call__(value)
 
+    def batch(self, values):
+        return Type.batch(self, values)
+
 
 class TypedProperty(object):
     """class for building property objects for schema objects"""
@@ -437,9 +613,59 @@ class NewTypeMeta(type):
             prop = TypedProperty(attr, type_func)
             setattr(cls, attr, prop)
         cls.__slots__ = tuple(slots)
+
+        fields = {}
+        for base in reversed(cls.__mro__[1:]):
+            fields.update(getattr(base, '_fields', {}))
+        fields.update(cls._types)
+        cls._fields = fields
+        cls._slotted = bool(nmspc.get('__slots__')) or any(getattr(base, '_slotted', False) for base in bases)
+        if fields and '__init__' not in nmspc and getattr(cls.__init__, '_schema_init', False) and \
+           cls.__dictoffset__ and not cls._slotted:
+            cls.__init__ = _compile_schema_init(cls, fields)
         super(NewTypeMeta, cls).__init__(name, bases, nmspc)
 
 
+def _compile_schema_init(cls, fields):
+    """Returns an `__init__` specialised to the fields of a Schema, validating all of them in a single pass
+
+       Only used by schemas that inherit the generic `Schema.__init__`, or another compiled one, and whose instances
+       keep their values in a `__dict__` rather than in declared `__slots__`.
+    """
+    validators = {name: ("_" + name, type_func) for name, type_func in fields.items()}
+    error_text = 'Invalid {0} passed in'.format(cls.__name__)
+
+    def __init__(self, json, force=False):
+        if self is json:
+            return
+        if force:
+            for key, value in json.items():
+                setattr(self, "_" + key, value)
+            return
+
+        values = self.__dict__
+        errors = None
+        for key, value in json.items():
+            validator = validators.get(key)
+            if validator is None:
+                setattr(self, key, value)
+                continue
+
+            private_name, type_func = validator
+            try:
+                values[private_name] = type_func(value)
+            except Exception as error:
+                if errors is None:
+                    errors = {}
+                errors[key] = _error_message(error)
+        if errors:
+            raise InvalidTypeData(error_text, errors)
+
+    __init__.__qualname__ = '{0}.__init__'.format(cls.__qualname__)
+    __init__._schema_init = True
+    return __init__
+
+
 class Schema(object, metaclass=NewTypeMeta):
     """Schema for creating complex types using hug types"""
     _hug_type = True
@@ -457,10 +683,74 @@ class Schema(object, metaclass=NewTypeMeta):
                 if force:
                     key = "_" + key
                 setattr(self, key, value)
+    __init__._schema_init = True
 
 json = JSON()
 
 
+class Memoized(Type):
+    """Remembers what a pure type handler returned for the most recently used raw input values
+
+       Values that fail validation, or that can't be hashed, aren't remembered. The hits and misses counters track
+       how often a value was, or wasn't, already known.
+    """
+    __slots__ = ('type_handler', 'results', 'hits', 'misses')
+
+    def __init__(self, type_handler, max_entries=1024):
+        self.type_handler = type_handler
+        self.results = LRU(max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def __doc__(self):
+        return self.type_handler.__doc__
+
+    def __call__(self, value):
+        key = (type(value), value)
+        try:
+            result = self.results.get(key, _UNKNOWN)
+        except TypeError:
+            return self.type_handler(value)
+
+        if result is not _UNKNOWN:
+            self.hits += 1
+            return result
+        self.misses += 1
+        return self.results.set(key, self.type_handler(value))
+
+    def accepts(self, value):
+        accepts = getattr(self.type_handler, 'accepts', None)
+        return accepts is None or accepts(value)
+
+    def clear(self):
+        """Forgets every remembered result, and resets the hit and miss counters"""
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+memoized_types = {}
+
+
+def memoize(type_handler, max_entries=1024):
+    """Returns a Memoized version of type_handler if it's marked as pure, otherwise returns type_handler as is
+
+       The same Memoized type is returned every time a given type handler is memoized, so that every endpoint using
+       it shares its results.
+    """
+    if not getattr(type_handler, 'pure', False):
+        return type_handler
+
+    try:
+        memoized = memoized_types.get(type_handler)
+    except TypeError:
+        return type_handler
+    if memoized is None:
+        memoized = memoized_types[type_handler] = Memoized(type_handler, max_entries)
+    return memoized
+
+
 class MarshmallowSchema(Type):
     """Allows using a Marshmallow Schema directly in a hug type annotation"""
     __slots__ = ("schema", )
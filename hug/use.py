@@ -21,9 +21,11 @@ OTHER DEALINGS IN THE SOFTWARE.
 """
 from __future__ import absolute_import
 
-import re
+import asyncio
+import base64
 import socket
 from collections import namedtuple
+from functools import partial
 from io import BytesIO
 from queue import Queue
 import sanic
@@ -35,8 +37,12 @@ from hug.api import API
 from hug.defaults import input_format
 from hug.format import parse_content_type
 
+try:  # pragma: no cover - aiohttp is an optional dependency
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
 Response = namedtuple('Response', ('data', 'status_code', 'headers'))
-Request = namedtuple('Request', ('content_length', 'stream', 'params'))
 
 
 class Service(object):
@@ -90,6 +96,51 @@ class Service(object):
         """Calls the service at the specified URL using the "CONNECT" method"""
         return self.request('CONNECT', url=url, headers=headers, timeout=timeout, **params)
 
+    async def gather(self, requests, concurrency=10, deadline=None):
+        """Makes every one of the requests concurrently, returning their results in the same order
+
+           Each request is given as the keyword arguments (a dict) or the positional arguments (a tuple) of a call to
+           `request`. At most concurrency requests are made at once. Services whose requests block are called from
+           the event loop's executor. A request that fails has the exception it raised as its result, and one that
+           hasn't completed once deadline seconds have passed is cancelled and has an asyncio.TimeoutError instead,
+           so that the results that did arrive in time can still be used.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        loop = asyncio.get_running_loop()
+        request_function = getattr(self, 'async_request', self.request)
+        blocks = not asyncio.iscoroutinefunction(request_function)
+
+        async def call(request):
+            if isinstance(request, dict):
+                args, kwargs = (), request
+            else:
+                args, kwargs = tuple(request) if isinstance(request, (tuple, list)) else (request, ), {}
+            async with semaphore:
+                if blocks:
+                    return await loop.run_in_executor(None, partial(request_function, *args, **kwargs))
+                return await request_function(*args, **kwargs)
+
+        calls = [asyncio.ensure_future(call(request)) for request in requests]
+        if not calls:
+            return []
+
+        done, pending = await asyncio.wait(calls, timeout=deadline)
+        for unfinished in pending:
+            unfinished.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+        results = []
+        for index, finished in enumerate(calls):
+            if finished in pending:
+                error = 'Request {0} did not complete within {1} seconds'.format(index, deadline)
+                results.append(asyncio.TimeoutError(error))
+            elif finished.exception() is not None:
+                results.append(finished.exception())
+            else:
+                results.append(finished.result())
+        return results
+
 
 class HTTP(Service):
     __slots__ = ('endpoint', 'session', 'json_transport')
@@ -119,6 +170,73 @@ class HTTP(Service):
         return Response(data, response.status_code, response.headers)
 
 
+class AsyncHTTP(Service):
+    """An HTTP service called without blocking the event loop, over a pool of keep-alive connections
+
+       At most limit connections are kept open at once, and at most limit_per_host of them to any one host. Requests
+       time out after the timeout given to them, or otherwise the timeout of the service. auth, if given, is a
+       (user, password) pair sent as Basic credentials.
+    """
+    __slots__ = ('endpoint', 'headers', 'json_transport', 'limit', 'limit_per_host', 'keepalive_timeout',
+                 '_session')
+
+    def __init__(self, endpoint, auth=None, version=None, headers=empty.dict, timeout=None, raise_on=(500, ),
+                 json_transport=True, limit=100, limit_per_host=0, keepalive_timeout=15.0, **kwargs):
+        if aiohttp is None:  # pragma: no cover
+            raise ImportError('aiohttp must be installed to use AsyncHTTP services')
+
+        super().__init__(timeout=timeout, raise_on=raise_on, version=version, **kwargs)
+        self.endpoint = endpoint
+        self.headers = dict(headers)
+        if auth:
+            user, password = auth
+            credentials = base64.b64encode('{0}:{1}'.format(user, password).encode('utf8')).decode('ascii')
+            self.headers['Authorization'] = 'Basic {0}'.format(credentials)
+        self.json_transport = json_transport
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+
+    @property
+    def session(self):
+        """The aiohttp.ClientSession pooling connections to the service, created on first use within an event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+        return self._session
+
+    async def request(self, method, url, url_params=empty.dict, headers=empty.dict, timeout=None, **params):
+        url = "{0}/{1}".format(self.version, url.lstrip('/')) if self.version else url
+        kwargs = {'json' if self.json_transport else 'params': params}
+        timeout = aiohttp.ClientTimeout(total=self.timeout if timeout is None else timeout)
+        async with self.session.request(method, self.endpoint + url.format(**url_params), headers=headers,
+                                        timeout=timeout, **kwargs) as response:
+            content_type, content_params = parse_content_type(response.headers.get('content-type', ''))
+            if content_type in input_format:
+                data = await input_format[content_type](response, **content_params)
+            else:
+                data = BytesIO(await response.read())
+
+        if response.status in self.raise_on:
+            raise requests.HTTPError('{0} {1} occured for url: {2}'.format(response.status, response.reason, url))
+
+        return Response(data, response.status, response.headers)
+
+    async def close(self):
+        """Closes every pooled connection to the service"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exception):
+        await self.close()
+
+
 class Local(Service):
     __slots__ = ('api', 'headers')
 
@@ -128,6 +246,25 @@ class Local(Service):
         self.headers = headers
 
     def request(self, method, url, url_params=empty.dict, headers=empty.dict, timeout=None, **params):
+        """Calls the local endpoint, returning its response
+
+           Can't be used from within a running event loop, as it would block the loop: use `async_request` there.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError('Local.request cannot be called from a running event loop, await async_request instead')
+
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.async_request(method, url, url_params, headers, timeout, **params))
+        finally:
+            loop.close()
+
+    async def async_request(self, method, url, url_params=empty.dict, headers=empty.dict, timeout=None, **params):
+        """Calls the local endpoint from a coroutine, returning its response"""
         function = self.api.http.versioned.get(self.version, {}).get(url, None)
         if not function:
             function = self.api.http.versioned.get(None, {}).get(url, None)
@@ -139,27 +276,56 @@ class Local(Service):
 
         interface = function.interface.http
         response = sanic.web.Response()
-        request = Request(None, None, empty.dict)
-        interface.set_response_defaults(response)
+        request = LocalRequest(method, url, dict(self.headers, **headers))
+        interface.set_response_defaults(response, request)
 
         params.update(url_params)
-        params = interface.gather_parameters(request, response, api_version=self.version, **params)
+        params = await interface.gather_parameters(request, response, api_version=self.version, **params)
         errors = interface.validate(params)
         if errors:
             interface.render_errors(errors, request, response)
         else:
-            interface.render_content(interface.call_function(**params), request, response)
+            response = await interface.render_content(await interface.call_function(**params), request, response)
 
-        data = BytesIO(response.data)
-        content_type, content_params = parse_content_type(response._headers.get('content-type', ''))
+        content_type, content_params = parse_content_type(response.headers.get('content-type', ''))
         if content_type in input_format:
-            data = input_format[content_type](data, **content_params)
+            data = await input_format[content_type](LocalBody(response.body or b''), **content_params)
+        else:
+            data = BytesIO(response.body or b'')
 
-        status_code = int(''.join(re.findall('\d+', response.status)))
-        if status_code in self.raise_on:
+        if response.status in self.raise_on:
             raise requests.HTTPError('{0} occured for url: {1}'.format(response.status, url))
 
-        return Response(data, status_code, response._headers)
+        return Response(data, response.status, response.headers)
+
+
+class LocalRequest(object):
+    """The parts of an HTTP request hug endpoints read, for calling them locally"""
+    __slots__ = ('method', 'path', 'headers', 'GET', 'content_length', 'content_type', 'content', 'context')
+
+    def __init__(self, method, path, headers=empty.dict):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.GET = {}
+        self.content_length = None
+        self.content_type = ''
+        self.content = None
+        self.context = {}
+
+    async def post(self):
+        return {}
+
+
+class LocalBody(object):
+    """Serves a locally rendered response body to input formats, as they'd read it from a request"""
+    __slots__ = ('content', )
+
+    def __init__(self, content):
+        self.content = content
+
+    async def read(self):
+        return self.content
 
 
 class Socket(Service):
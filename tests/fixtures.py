@@ -1,4 +1,5 @@
 """Defines fixtures that can be used to streamline tests and / or define dependencies"""
+import asyncio
 from random import randint
 
 import pytest
@@ -21,3 +22,15 @@ def hug_api():
                         hug.routing.LocalRouter().api(api),
                         hug.routing.CLIRouter().api(api))
     return api
+
+
+@pytest.fixture
+def run():
+    """Defines a helper that runs a single coroutine to completion on its own event loop"""
+    def run_coroutine(coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+    return run_coroutine
@@ -19,11 +19,15 @@ CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFT
 OTHER DEALINGS IN THE SOFTWARE.
 
 """
+import asyncio
 import os
 import sys
 par_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
 sys.path.append(par_dir)
 
+import pytest
+import sanic
+
 import hug
 
 api = hug.API(__name__)
@@ -60,3 +64,100 @@ def test_api_fixture(hug_api):  # fix this later
     """Ensure it's possible to dynamically insert a new hug API on demand"""
     assert isinstance(hug_api, hug.API)
     assert hug_api != api
+
+
+class VersionedRequest(object):
+    """A minimal stand-in for the parts of a request hug reads the requested API version from"""
+
+    def __init__(self, path='/', headers=None, query=None):
+        self.path = path
+        self.headers = headers or {}
+        self.GET = query or {}
+
+
+def test_determine_version(hug_api):
+    """Test to ensure the requested API version is read from the path prefix, header, or query string"""
+    hug_api.http.versions.update((1, 10))
+    assert hug_api.http.determine_version(VersionedRequest('/v1/users'), False) == 1
+    assert hug_api.http.determine_version(VersionedRequest('/v10/users'), False) == 10
+    assert hug_api.http.determine_version(VersionedRequest('/v2/users'), False) is None
+    assert hug_api.http.determine_version(VersionedRequest('/users/v1'), False) is None
+    assert hug_api.http.determine_version(VersionedRequest(headers={'X-API-VERSION': '10'})) == 10
+    assert hug_api.http.determine_version(VersionedRequest(query={'api_version': '1'})) == 1
+    assert hug_api.http.determine_version(VersionedRequest('/v1/users', {'X-API-VERSION': '1'}), False) == 1
+    with pytest.raises(sanic.web.HTTPBadRequest):
+        hug_api.http.determine_version(VersionedRequest('/v1/users', {'X-API-VERSION': '10'}), False)
+    with pytest.raises(sanic.web.HTTPBadRequest):
+        hug_api.http.determine_version(VersionedRequest(headers={'X-API-VERSION': 'abc'}))
+    with pytest.raises(sanic.web.HTTPBadRequest):
+        hug_api.http.determine_version(VersionedRequest(query={'api_version': '1.5'}))
+
+
+def test_version_router(hug_api):
+    """Test to ensure requests are routed to the interface of the version they ask for, without a route per version"""
+    hug_api.http.versions.update((1, 2, 3))
+
+    def handler(name):
+        async def handle(request, api_version=None, **kwargs):
+            return name, api_version
+        return handle
+
+    async def not_found(request):
+        return 'not found'
+
+    route = hug_api.http.version_router({None: handler('default'), 2: handler('second')}, not_found)
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(route(VersionedRequest())) == ('default', None)
+        assert loop.run_until_complete(route(VersionedRequest(), api_version=2)) == ('second', 2)
+        assert loop.run_until_complete(route(VersionedRequest(), api_version=1)) == ('default', 1)
+        assert loop.run_until_complete(route(VersionedRequest(headers={'X-API-VERSION': '2'}))) == ('second', 2)
+        assert loop.run_until_complete(route(VersionedRequest(), api_version=4)) == ('default', 4)
+
+        only_versioned = hug_api.http.version_router({2: handler('second')}, not_found)
+        assert loop.run_until_complete(only_versioned(VersionedRequest())) == 'not found'
+        assert loop.run_until_complete(only_versioned(VersionedRequest(), api_version=3)) == ('second', 3)
+        assert loop.run_until_complete(only_versioned(VersionedRequest(), api_version=4)) == 'not found'
+    finally:
+        loop.close()
+
+
+def test_unversioned_api_ignores_requested_versions(hug_api, run):
+    """Test to ensure an API without versions keeps serving clients that send a version anyway"""
+    async def handle(request, api_version=None, **kwargs):
+        return 'default'
+
+    route = hug_api.http.version_router({None: handle})
+    assert hug_api.http.determine_version(VersionedRequest(headers={'X-API-VERSION': 'abc'})) is None
+    assert hug_api.http.determine_version(VersionedRequest(headers={'X-API-VERSION': '1'},
+                                                           query={'api_version': '2'})) is None
+    assert run(route(VersionedRequest(headers={'X-API-VERSION': '1'}))) == 'default'
+    assert run(route(VersionedRequest(query={'api_version': 'abc'}))) == 'default'
+
+
+def test_exception_lookup(hug_api):
+    """Test to ensure exception handlers are resolved per exception class, and re-resolved once handlers change"""
+    def value_error(request, exception):
+        pass
+
+    def lookup_error(request, exception):
+        pass
+
+    def key_error(request, exception):
+        pass
+
+    hug_api.http.add_exception_handler(ValueError, value_error)
+    hug_api.http.add_exception_handler(LookupError, lookup_error)
+    lookup = hug_api.http.exception_lookup()
+    assert lookup.types == (ValueError, LookupError)
+    assert lookup.handler(ValueError) is value_error
+    assert lookup.handler(UnicodeDecodeError) is value_error
+    assert lookup.handler(KeyError) is lookup_error
+    assert lookup.handler(TypeError) is None
+    assert hug_api.http.exception_lookup() is lookup
+    assert hug_api.http.exception_lookup(1) is lookup
+
+    hug_api.http.add_exception_handler(KeyError, key_error)
+    assert hug_api.http.exception_lookup() is not lookup
+    assert hug_api.http.exception_lookup().handler(KeyError) is key_error
+    assert hug_api.http.exception_lookup().handler(IndexError) is lookup_error
@@ -0,0 +1,194 @@
+"""tests/test_authentication.py.
+
+Tests the authentication helpers included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import asyncio
+import base64
+
+import pytest
+
+import hug
+
+
+class FakeRequest(object):
+    """The parts of a request read by hug's authenticators"""
+
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+        self.context = {}
+
+
+class FakeResponse(object):
+    """The parts of a response written to by hug's authenticators"""
+
+    def __init__(self):
+        self.headers = {}
+
+
+def test_basic(run):
+    """Test to ensure basic authentication verifies users, including with coroutine verifiers"""
+    async def verify_user(user_name, password):
+        return user_name if (user_name, password) == ('Tim', 'Custom password') else None
+
+    authenticate = hug.authentication.basic(verify_user)
+    credentials = base64.b64encode(b'Tim:Custom password').decode('utf8')
+    request = FakeRequest({'Authorization': 'Basic {0}'.format(credentials)})
+    assert run(authenticate(request, FakeResponse())) is True
+    assert request.context['user'] == 'Tim'
+
+    with pytest.raises(Exception):
+        run(authenticate(FakeRequest(), FakeResponse()))
+
+    invalid = base64.b64encode(b'Tim:Wrong password').decode('utf8')
+    with pytest.raises(Exception):
+        run(authenticate(FakeRequest({'Authorization': 'Basic {0}'.format(invalid)}), FakeResponse()))
+
+    simple = hug.authentication.basic(hug.authentication.verify('Tim', 'Custom password'))
+    assert run(simple(FakeRequest({'Authorization': 'Basic {0}'.format(credentials)}), FakeResponse())) is True
+
+
+def test_api_key(run):
+    """Test to ensure API key authentication verifies the provided key"""
+    authenticate = hug.authentication.api_key(lambda key: 'Bacon' if key == 'Bacon' else None)
+    request = FakeRequest({'X-Api-Key': 'Bacon'})
+    assert run(authenticate(request, FakeResponse())) is True
+    assert request.context['user'] == 'Bacon'
+    with pytest.raises(Exception):
+        run(authenticate(FakeRequest({'X-Api-Key': 'Invalid'}), FakeResponse()))
+
+
+def test_cached(run):
+    """Test to ensure cached verifiers remember both verified and rejected credentials"""
+    calls = []
+
+    async def verify_token(token):
+        calls.append(token)
+        await asyncio.sleep(0)
+        return {'name': 'Tim'} if token == 'valid' else None
+
+    verify = hug.authentication.cached(verify_token, ttl=60, invalid_ttl=60)
+
+    async def verify_all():
+        concurrent = await asyncio.gather(verify('valid'), verify('valid'), verify('invalid'))
+        return concurrent + [await verify('valid'), await verify('invalid')]
+
+    assert run(verify_all()) == [{'name': 'Tim'}, {'name': 'Tim'}, None, {'name': 'Tim'}, None]
+    assert calls == ['valid', 'invalid']
+    assert 'valid' not in str(list(verify.results.items))
+
+    authenticate = hug.authentication.token(verify)
+    assert run(authenticate(FakeRequest({'Authorization': 'valid'}), FakeResponse())) is True
+    assert calls == ['valid', 'invalid']
+
+
+def test_cached_cancellation(run):
+    """Test to ensure cancelling the first caller doesn't cancel a verification others are waiting on"""
+    async def verify_token(token):
+        await asyncio.sleep(0.01)
+        return {'name': 'Tim'}
+
+    verify = hug.authentication.cached(verify_token)
+
+    async def cancel_first():
+        first = asyncio.ensure_future(verify('valid'))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(verify('valid'))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert run(cancel_first()) == {'name': 'Tim'}
+    assert len(verify.results) == 1
+
+
+def test_check_requirements(hug_api, run):
+    """Test to ensure requirements may be coroutines, evaluated in order and stopping at the first failure"""
+    started = []
+
+    async def authenticates(request, response, **kwargs):
+        await asyncio.sleep(0.01)
+        request.context['user'] = 'Tim'
+        return True
+
+    def needs_user(request, response, **kwargs):
+        started.append('needs_user')
+        return True if request.context.get('user') else 'no user yet'
+
+    async def slow(request, response, **kwargs):
+        started.append('slow')
+        await asyncio.sleep(0.01)
+        return 'slow failed'
+
+    async def fast(request, response, **kwargs):
+        started.append('fast')
+        return 'fast failed'
+
+    @hug_api.route.http.get(requires=(authenticates, needs_user, slow, fast))
+    def endpoint():
+        return 'Not reached'
+
+    interface = hug_api.http.routes['']['/endpoint']['GET'][None]
+    assert run(interface.check_requirements(FakeRequest(), FakeResponse())) == 'slow failed'
+    assert started == ['needs_user', 'slow']
+
+
+def test_verify_hashed(tmpdir, run):
+    """Test to ensure users can be verified against a table of password hashes, loaded from a file"""
+    password_hash = hug.authentication.hash_password('Custom password', iterations=1000)
+    assert password_hash.startswith('pbkdf2_sha256$1000$')
+    assert hug.authentication.check_password('Custom password', password_hash)
+    assert not hug.authentication.check_password('Wrong password', password_hash)
+    assert not hug.authentication.check_password('Custom password', 'not a hash')
+
+    credentials_file = tmpdir.join('credentials')
+    credentials_file.write('# user:hash\nTim:{0}\n'.format(password_hash))
+    credentials = hug.authentication.load_credentials(str(credentials_file))
+    assert credentials == {'Tim': password_hash}
+
+    verify_user = hug.authentication.verify_hashed(credentials)
+    assert run(verify_user('Tim', 'Custom password')) == 'Tim'
+    assert len(verify_user.verified) == 1
+    assert run(verify_user('Tim', 'Custom password')) == 'Tim'
+    assert run(verify_user('Tim', 'Wrong password')) is False
+    assert run(verify_user('Unknown', 'Custom password')) is False
+    assert len(verify_user.verified) == 1
+
+
+def test_signed_token(run):
+    """Test to ensure signed tokens authenticate requests, storing their claims as the user"""
+    key_set = hug.tokens.KeySet('secret')
+    authenticate = hug.authentication.signed_token(key_set)
+    request = FakeRequest({'Authorization': 'Bearer ' + key_set.sign({'user': 'Tim'})})
+    assert run(authenticate(request, FakeResponse())) is True
+    assert request.context['user'] == {'user': 'Tim'}
+    with pytest.raises(Exception):
+        run(authenticate(FakeRequest({'Authorization': 'Bearer invalid'}), FakeResponse()))
+
+    request = FakeRequest({'Authorization': 'Bearer ' + key_set.sign({})})
+    assert run(authenticate(request, FakeResponse())) is True
+    assert request.context['user'] == {}
+
+
+def test_token_rejects_falsy_verification(run):
+    """Test to ensure token verifiers returning any falsy value reject the request"""
+    for invalid in ('', 0, {}, [], None, False):
+        authenticate = hug.authentication.token(lambda token, invalid=invalid: invalid)
+        with pytest.raises(Exception):
+            run(authenticate(FakeRequest({'Authorization': 'token'}), FakeResponse()))
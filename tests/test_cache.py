@@ -0,0 +1,93 @@
+"""tests/test_cache.py.
+
+Tests the bounded in-memory caches included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import os
+import time
+
+import hug
+
+
+def test_lru():
+    """Ensure the least recently used items are evicted once either the entry or byte limit is exceeded"""
+    cache = hug.cache.LRU(max_entries=2)
+    cache.set('first', 1)
+    cache.set('second', 2)
+    assert cache.get('first') == 1
+    cache.set('third', 3)
+    assert 'second' not in cache
+    assert len(cache) == 2
+    assert cache.get('missing', 'default') == 'default'
+
+    cache = hug.cache.LRU(max_entries=10, max_bytes=10)
+    cache.set('first', b'12345', 5)
+    cache.set('second', b'12345', 5)
+    assert cache.bytes == 10
+    cache.set('third', b'1', 1)
+    assert 'first' not in cache and cache.bytes == 6
+    cache.set('huge', b'12345678901', 11)
+    assert 'huge' not in cache and cache.bytes == 6
+    assert cache.pop('second') == b'12345' and cache.bytes == 1
+    cache.clear()
+    assert not cache and cache.bytes == 0
+
+
+def test_ttl():
+    """Ensure items expire once their time to live has passed"""
+    cache = hug.cache.TTL(max_entries=2, ttl=60)
+    cache.set('first', 1)
+    cache.set('brief', 2, ttl=0.01)
+    assert cache.get('first') == 1
+    assert 'brief' in cache
+    time.sleep(0.02)
+    assert 'brief' not in cache
+    assert cache.get('brief', 'expired') == 'expired'
+    assert len(cache) == 1
+    assert cache.pop('first') == 1
+    assert cache.pop('first', 'missing') == 'missing'
+
+
+def test_file_cache(tmpdir):
+    """Ensure resolved paths and small file contents are cached, and revalidated once the check interval passes"""
+    small = tmpdir.join('small.txt')
+    small.write('small')
+    large = tmpdir.join('large.txt')
+    large.write('large' * 10)
+    resolved = []
+
+    def resolve(name):
+        resolved.append(name)
+        path = os.path.join(str(tmpdir), name)
+        return path if os.path.isfile(path) else None
+
+    file_cache = hug.cache.FileCache(max_file_size=10, check_interval=60)
+    cached = file_cache.get('small.txt', resolve)
+    assert cached.read() == b'small' and cached.name == str(small)
+    assert file_cache.get('small.txt', resolve).read() == b'small'
+    assert file_cache.get('large.txt', resolve) == str(large)
+    assert file_cache.get('large.txt', resolve) == str(large)
+    assert file_cache.get('missing.txt', resolve) is None
+    assert resolved == ['small.txt', 'large.txt', 'missing.txt']
+
+    file_cache.check_interval = 0
+    small.write('changed')
+    os.utime(str(small), (time.time() + 10, time.time() + 10))
+    assert file_cache.get('small.txt', resolve).read() == b'changed'
+    assert resolved[-1] == 'small.txt'
@@ -0,0 +1,112 @@
+"""tests/test_compression.py.
+
+Tests the response compression included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import asyncio
+import gzip
+import os
+
+import sanic
+from aiohttp.test_utils import make_mocked_request
+
+import hug
+
+
+def request(accept_encoding):
+    return make_mocked_request('GET', '/', headers={'Accept-Encoding': accept_encoding})
+
+
+def test_negotiate():
+    """Ensure the accepted content coding with the highest quality is chosen, in order of server preference"""
+    assert hug.compression.negotiate('gzip, deflate', ('br', 'gzip')) == 'gzip'
+    assert hug.compression.negotiate('gzip, br', ('br', 'gzip')) == 'br'
+    assert hug.compression.negotiate('br;q=0.5, gzip', ('br', 'gzip')) == 'gzip'
+    assert hug.compression.negotiate('*', ('br', 'gzip')) == 'br'
+    assert hug.compression.negotiate('gzip;q=0, identity', ('br', 'gzip')) is None
+    assert hug.compression.negotiate('', ('br', 'gzip')) is None
+    assert hug.compression.negotiate(None, ('br', 'gzip')) is None
+
+
+def test_apply(run):
+    """Ensure only bodies over the threshold with an allowed content type are compressed"""
+    compression = hug.compression.Compression(threshold=100, encodings=('gzip', ), cache_bytes=1024 * 1024)
+    body = b'{"key": "value"}' * 100
+
+    response = sanic.web.Response(body=body, content_type='application/json')
+    run(compression.apply(request('gzip'), response))
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.body) == body
+    assert len(compression.cache) == 1
+    assert body not in list(compression.cache.items)[0]
+
+    response = sanic.web.Response(body=body, content_type='application/json')
+    run(compression.apply(request('identity'), response))
+    assert 'Content-Encoding' not in response.headers and response.body == body
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+    response = sanic.web.Response(body=b'{}', content_type='application/json')
+    run(compression.apply(request('gzip'), response))
+    assert 'Content-Encoding' not in response.headers
+
+    response = sanic.web.Response(body=body, content_type='image/png')
+    run(compression.apply(request('gzip'), response))
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_apply_in_executor(run, monkeypatch):
+    """Ensure large bodies are compressed, and hashed for the cache, in the event loop's executor"""
+    compression = hug.compression.Compression(threshold=100, encodings=('gzip', ), cache_bytes=1024 * 1024,
+                                              executor_threshold=1000)
+    body = b'{"key": "value"}' * 100
+    loop = asyncio.new_event_loop()
+    executed = []
+    run_in_executor = loop.run_in_executor
+    monkeypatch.setattr(loop, 'run_in_executor', lambda *args: executed.append(args[1]) or run_in_executor(*args))
+
+    for attempt in range(2):
+        response = sanic.web.Response(body=body, content_type='application/json')
+        loop.run_until_complete(compression.apply(request('gzip'), response))
+        assert gzip.decompress(response.body) == body
+    loop.close()
+    assert executed == [compression.cache_key, compression.encode, compression.cache_key]
+
+    response = sanic.web.Response(body=b'{"key": "value"}' * 10, content_type='application/json')
+    run(compression.apply(request('gzip'), response))
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(executed) == 3
+
+
+def test_sibling(tmpdir):
+    """Ensure precompressed siblings are only used when accepted, and at least as new as the original file"""
+    original = tmpdir.join('style.css')
+    original.write('body {}')
+    compressed = tmpdir.join('style.css.gz')
+    compressed.write_binary(gzip.compress(b'body {}'))
+    path = str(original)
+    stat = os.stat(path)
+
+    compression = hug.compression.Compression()
+    assert compression.sibling(request('gzip, br'), path, stat) == ('gzip', str(compressed))
+    assert compression.sibling(request('br'), path, stat) is None
+    assert hug.compression.Compression(precompressed=False).sibling(request('gzip'), path, stat) is None
+
+    os.utime(str(compressed), (stat.st_mtime - 10, stat.st_mtime - 10))
+    assert compression.sibling(request('gzip'), path, stat) is None
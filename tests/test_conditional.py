@@ -0,0 +1,113 @@
+"""tests/test_conditional.py.
+
+Tests the conditional GET handling included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import asyncio
+import os
+from collections import namedtuple
+
+import sanic
+from aiohttp.test_utils import make_mocked_request
+
+import hug
+
+from .constants import BASE_DIRECTORY
+
+FakeStat = namedtuple('FakeStat', ('st_ino', 'st_size', 'st_mtime'))
+README = os.path.join(BASE_DIRECTORY, 'README.md')
+
+
+def test_etag():
+    """Ensure entity tags change whenever the size, modification time, or inode of a file does"""
+    stat = FakeStat(st_ino=1, st_size=100, st_mtime=1000000000.5)
+    assert hug.conditional.etag(stat) == hug.conditional.etag(FakeStat(*stat))
+    assert hug.conditional.etag(stat) != hug.conditional.etag(stat._replace(st_size=101))
+    assert hug.conditional.etag(stat) != hug.conditional.etag(stat._replace(st_mtime=1000000000.6))
+    assert hug.conditional.etag(stat) != hug.conditional.etag(stat._replace(st_ino=2))
+
+
+def test_content_etag(run, monkeypatch):
+    """Ensure content hashed entity tags are computed once per file version, off the event loop when one is running"""
+    hashed = []
+    hash_file = hug.conditional.hash_file
+    monkeypatch.setattr(hug.conditional, 'hash_file', lambda path: hashed.append(path) or hash_file(path))
+    hug.conditional.content_etags.clear()
+
+    stat = os.stat(README)
+    entity_tag = hug.conditional.content_etag(README, stat)
+    assert entity_tag.startswith('"') and entity_tag != hug.conditional.etag(stat)
+    assert hug.conditional.content_etag(README, stat) == entity_tag
+    assert hashed == [README]
+
+    hug.conditional.content_etags.clear()
+
+    async def hash_in_executor():
+        assert hug.conditional.content_etag(README, stat) is None
+        response = sanic.web.Response()
+        hug.conditional.check(README, make_mocked_request('GET', '/'), response, hash_content=True, stat=stat)
+        assert response.headers['ETag'] == hug.conditional.etag(stat)
+        await hug.conditional.hashing[(README, stat.st_ino, stat.st_size, stat.st_mtime)]
+        await asyncio.sleep(0)
+        return hug.conditional.content_etag(README, stat)
+    assert run(hash_in_executor()) == entity_tag
+    assert hashed == [README, README]
+    assert not hug.conditional.hashing
+
+
+def test_not_modified():
+    """Ensure If-None-Match is compared weakly and takes precedence over If-Modified-Since"""
+    entity_tag = '"current"'
+    modified = 1000000000.5
+    last_modified = hug.conditional.http_date(modified)
+
+    def conditional(method='GET', **headers):
+        return hug.conditional.not_modified(make_mocked_request(method, '/', headers=headers), entity_tag, modified)
+
+    assert not conditional()
+    assert conditional(**{'If-None-Match': entity_tag})
+    assert conditional(**{'If-None-Match': 'W/"current"'})
+    assert conditional(**{'If-None-Match': '"other", "current"'})
+    assert conditional(**{'If-None-Match': '*'})
+    assert not conditional(**{'If-None-Match': '"other"'})
+    assert not conditional('POST', **{'If-None-Match': entity_tag})
+
+    assert conditional(**{'If-Modified-Since': last_modified})
+    assert not conditional(**{'If-Modified-Since': hug.conditional.http_date(modified - 10)})
+    assert not conditional(**{'If-Modified-Since': 'not a date'})
+    assert not conditional(**{'If-None-Match': '"other"', 'If-Modified-Since': last_modified})
+
+
+def test_check():
+    """Ensure checking a path sets its validators, and a 304 status when the client's copy is current"""
+    response = sanic.web.Response()
+    assert not hug.conditional.check(README, make_mocked_request('GET', '/'), response)
+    assert response.status == 200
+    entity_tag = response.headers['ETag']
+    assert response.headers['Last-Modified'] == hug.conditional.http_date(os.stat(README).st_mtime)
+
+    response = sanic.web.Response()
+    assert hug.conditional.check(README, make_mocked_request('GET', '/', headers={'If-None-Match': entity_tag}),
+                                 response)
+    assert response.status == 304
+
+    response = sanic.web.Response()
+    assert not hug.conditional.check(README, make_mocked_request('GET', '/', headers={'If-None-Match': entity_tag}),
+                                     response, hash_content=True)
+    assert response.headers['ETag'] == hug.conditional.content_etag(README, os.stat(README))
@@ -19,6 +19,7 @@ CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFT
 OTHER DEALINGS IN THE SOFTWARE.
 
 """
+import gzip
 import json
 import os
 import sys
@@ -27,6 +28,7 @@ from unittest import mock
 import sanic
 import pytest
 import requests
+from aiohttp.test_utils import make_mocked_request
 
 import hug
 
@@ -716,6 +718,268 @@ async def test_adding_headers(cli):
     assert await resp.text() == '""'
     assert resp.headers['name'] == 'Timothy'
 
+
+async def test_compiled_endpoints(loop, test_client):
+    """Test to ensure endpoints served as compiled coroutines behave exactly like the generic interface"""
+    compiled = hello_world.interface.http.compile()
+    assert compiled.interface is hello_world.interface
+
+    cli = await test_client(api.http.aio_server(loop, compiled=True))
+    resp = await cli.post('/hello_world')
+    assert await resp.text() == '"Hello World!"'
+
+    resp = await cli.get('/echo?text=Hello')
+    assert await resp.text() == '"Hello"'
+
+    resp = await cli.get('/echo')
+    assert "required" in json.loads(await resp.text())['errors']['text'].lower()
+
+    resp = await cli.get('/endpoint')
+    assert resp.headers['name'] == 'Timothy'
+
+
+def test_compiled_endpoint_names():
+    """Test to ensure every compiled endpoint is named uniquely, as Sanic registers routes by handler name"""
+    handlers = [hello_world.interface.http.compile(), endpoint.interface.http.compile()]
+    assert handlers[0].__name__.startswith('hello_world_v')
+    assert handlers[1].__name__.startswith('endpoint_v')
+
+    app = sanic.Sanic('compiled_endpoint_names')
+    for handler in handlers:
+        app.add_route(handler, '/' + handler.__name__)
+    assert len(app.router.routes) == 2
+
+
+def test_parameter_precedence(hug_api, run):
+    """Test to ensure the body, query string, form and URL take the same precedence whatever the signature"""
+    @hug_api.route.http.post()
+    def declared(first, second, third, fourth):
+        return [first, second, third, fourth]
+
+    @hug_api.route.http.post()
+    def takes_kwargs(**kwargs):
+        return kwargs
+
+    class Request(object):
+        GET = {'first': 'query', 'second': 'query', 'third': 'query'}
+        content_length = 26
+        content_type = 'application/json'
+        headers = {}
+
+        def __init__(self):
+            self.content = hug.use.LocalBody(b'{"first": "body", "x": 1}')
+
+        async def post(self):
+            return {'first': 'form', 'second': 'form', 'third': 'form', 'fourth': 'form'}
+
+    url_parameters = {'first': 'url', 'second': 'url', 'third': 'url', 'fourth': 'url'}
+    expected = {'first': 'body', 'second': 'query', 'third': 'query', 'fourth': 'form'}
+    for endpoint in (declared, takes_kwargs):
+        interface = hug_api.http.routes['']['/' + endpoint.__name__]['POST'][None]
+        parameters = run(interface.gather_parameters(Request(), None, **url_parameters))
+        assert {name: parameters[name] for name in expected} == expected
+
+
+def test_form_read_lazily(hug_api, run):
+    """Test to ensure the posted form is only read when the body and query string leave declared names unset"""
+    @hug_api.route.http.post()
+    def from_query(first, second):
+        return [first, second]
+
+    class Request(object):
+        GET = {'first': 'query', 'second': 'query'}
+        content_length = 0
+        content_type = 'application/json'
+        headers = {}
+        content = None
+        posted = 0
+
+        async def post(self):
+            self.posted += 1
+            return {'first': 'form', 'second': 'form'}
+
+    interface = hug_api.http.routes['']['/from_query']['POST'][None]
+    request = Request()
+    assert run(interface.gather_parameters(request, None)) == {'first': 'query', 'second': 'query'}
+    assert not request.posted
+
+    request.GET = {'first': 'query'}
+    assert run(interface.gather_parameters(request, None)) == {'first': 'query', 'second': 'form'}
+    assert request.posted == 1
+
+
+def test_unused_body_not_decoded(hug_api, run):
+    """Test to ensure the body is never decoded for endpoints that declare nothing that could be taken from it"""
+    decoded = []
+
+    async def input_format(body, **kwargs):
+        decoded.append(body)
+        return {}
+    hug_api.http.set_input_format('application/json', input_format)
+
+    @hug_api.route.http.post()
+    def no_parameters():
+        return 'no parameters'
+
+    @hug_api.route.http.post()
+    def injected_only(request, response):
+        return 'injected only'
+
+    class Request(object):
+        GET = {}
+        content_length = 2
+        content_type = 'application/json'
+        headers = {}
+        content = hug.use.LocalBody(b'{}')
+
+        async def post(self):
+            return {}
+
+    for endpoint in (no_parameters, injected_only):
+        interface = hug_api.http.routes['']['/' + endpoint.__name__]['POST'][None]
+        run(interface.gather_parameters(Request(), None))
+    assert decoded == []
+
+
+@hug.post()
+async def declared_parameters(first, second='default'):
+    return [first, second]
+
+
+async def test_declared_parameter_gathering(cli):
+    """Test to ensure only declared parameters are gathered, with the body taking precedence over the query string"""
+    resp = await cli.post('/declared_parameters?first=query&unused=1', data={'first': 'form', 'other': 'form'})
+    assert json.loads(await resp.text()) == ['query', 'default']
+
+    resp = await cli.post('/declared_parameters?first=query', json={'first': 'body', 'second': 'body', 'other': 1})
+    assert json.loads(await resp.text()) == ['body', 'body']
+
+
+@hug.get()
+def streamed_rows(count: int=3):
+    return ({'row': number} for number in range(count))
+
+
+@hug.get(output=hug.output_format.ndjson)
+async def streamed_lines():
+    for number in range(3):
+        yield {'line': number}
+
+
+async def test_streamed_content(cli):
+    """Test to ensure iterators and asynchronous iterators are rendered item by item using chunked encoding"""
+    resp = await cli.get('/streamed_rows')
+    assert resp.headers['Transfer-Encoding'] == 'chunked'
+    assert json.loads(await resp.text()) == [{'row': 0}, {'row': 1}, {'row': 2}]
+
+    resp = await cli.get('/streamed_rows?count=0')
+    assert json.loads(await resp.text()) == []
+
+    resp = await cli.get('/streamed_lines')
+    assert resp.headers['Content-Type'].startswith('application/x-ndjson')
+    assert [json.loads(line) for line in (await resp.text()).splitlines()] == [{'line': 0}, {'line': 1}, {'line': 2}]
+
+
+def test_streamed_content_transform(hug_api, run):
+    """Test to ensure streamed results are transformed as a whole, unless the route asks for every item instead"""
+    @hug_api.route.http.get(transform=lambda rows: [row['n'] for row in rows])
+    def whole():
+        return ({'n': number} for number in range(3))
+
+    @hug_api.route.http.get(transform=lambda row: row['n'], transform_items=True)
+    def each():
+        return ({'n': number} for number in range(3))
+
+    request = make_mocked_request('GET', '/whole')
+    response = run(hug_api.http.routes['']['/whole']['GET'][None](request))
+    assert response.body == b'[0, 1, 2]'
+
+    request = make_mocked_request('GET', '/each')
+    run(hug_api.http.routes['']['/each']['GET'][None](request))
+    assert b''.join(call[0][0] for call in request._payload_writer.write.call_args_list) == b'[0,1,2]'
+
+
+def test_streamed_content_errors(hug_api, run):
+    """Test to ensure a stream failing part way through is cut short, while failing right away is still handled"""
+    @hug_api.route.http.get()
+    def fails_later():
+        yield 1
+        raise ValueError('Streaming failed')
+
+    @hug_api.route.http.get()
+    def fails_first():
+        raise ValueError('Streaming failed')
+        yield 1
+
+    transport = mock.Mock()
+    request = make_mocked_request('GET', '/fails_later', transport=transport)
+    run(hug_api.http.routes['']['/fails_later']['GET'][None](request))
+    assert b''.join(call[0][0] for call in request._payload_writer.write.call_args_list) == b'[1'
+    assert transport.close.called
+    assert not request._payload_writer.write_eof.called
+
+    transport = mock.Mock()
+    with pytest.raises(ValueError):
+        run(hug_api.http.routes['']['/fails_first']['GET'][None](make_mocked_request('GET', '/fails_first',
+                                                                                       transport=transport)))
+    assert not transport.close.called
+
+
+def test_cached_file_content(hug_api, run, tmpdir):
+    """Test to ensure files served from a file cache still support ranges and precompressed siblings"""
+    tmpdir.join('cached.txt').write_binary(b'0123456789')
+    tmpdir.join('cached.txt.gz').write_binary(gzip.compress(b'0123456789'))
+    file_cache = hug.cache.FileCache()
+
+    @hug_api.route.http.get(output=hug.output_format.file, compress=True)
+    def cached():
+        return file_cache.get('cached.txt', lambda name: str(tmpdir.join(name)))
+
+    def get(**headers):
+        request = make_mocked_request('GET', '/cached', headers=headers)
+        response = run(hug_api.http.routes['']['/cached']['GET'][None](request))
+        return response, b''.join(call[0][0] for call in request._payload_writer.write.call_args_list)
+
+    response, body = get(Range='bytes=2-4')
+    assert response.status == 206
+    assert response.headers['Content-Range'] == 'bytes 2-4/10'
+    assert body == b'234'
+
+    response, body = get(**{'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body) == b'0123456789'
+
+    response, body = get()
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert body == b'0123456789'
+
+
+@hug.get(output=hug.output_format.file)
+async def served_file():
+    return os.path.join(BASE_DIRECTORY, 'README.md')
+
+
+async def test_file_serving(cli):
+    """Test to ensure files are sent from the file descriptor with the length taken from the file system"""
+    with open(os.path.join(BASE_DIRECTORY, 'README.md'), 'rb') as readme:
+        expected = readme.read()
+
+    resp = await cli.get('/served_file')
+    assert resp.headers['Content-Length'] == str(len(expected))
+    assert await resp.read() == expected
+
+    resp = await cli.get('/served_file', headers={'Range': 'bytes=-10', 'If-Range': resp.headers['ETag']})
+    assert resp.status == 206
+    assert resp.headers['Content-Range'] == 'bytes {0}-{1}/{2}'.format(len(expected) - 10, len(expected) - 1,
+                                                                        len(expected))
+    assert await resp.read() == expected[-10:]
+
+    resp = await cli.get('/served_file', headers={'Range': 'bytes={0}-'.format(len(expected))})
+    assert resp.status == 416
+
+    resp = await cli.get('/served_file', headers={'If-None-Match': resp.headers['ETag']})
+    assert resp.status == 304
+
 # @pytest.mark.skipif(sys.platform == 'win32', reason='Currently failing on Windows build')
 # def test_exceptions():    todo
 #     """Test to ensure hug's exception handling decorator works as expected"""
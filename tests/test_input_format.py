@@ -0,0 +1,84 @@
+"""tests/test_input_format.py.
+
+Tests the input format handlers included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import json
+
+import pytest
+import sanic
+
+import hug
+
+
+class ChunkedBody(object):
+    """Mimics a request body stream that delivers its content a few bytes at a time"""
+
+    def __init__(self, content, chunk_size=3):
+        self.content = content
+        self.chunk_size = chunk_size
+
+    async def readany(self):
+        chunk, self.content = self.content[:self.chunk_size], self.content[self.chunk_size:]
+        return chunk
+
+    async def read(self):
+        content, self.content = self.content, b''
+        return content
+
+
+def test_json(run):
+    """Ensure that the json input format works as intended"""
+    test_data = {'a': 'ü', 'b': [1, 2.5]}
+    assert run(hug.input_format.json(ChunkedBody(json.dumps(test_data).encode('utf8')))) == test_data
+    assert run(hug.input_format.json(ChunkedBody('"ü"'.encode('latin1')), charset='latin1')) == 'ü'
+
+
+def test_json_stream(run):
+    """Ensure that the streaming json input format decodes bodies regardless of how they are chunked"""
+    json_stream = hug.input_format.json_stream()
+    for test_data in ([], [1, 2.5, -3e5, 'ünï', {'a': [None, True, False]}, 123456789], {'not': 'an array'}, 'text'):
+        encoded = ' {0}\n'.format(json.dumps(test_data, ensure_ascii=False)).encode('utf8')
+        for chunk_size in (1, 2, 7, len(encoded)):
+            assert run(json_stream(ChunkedBody(encoded, chunk_size))) == test_data
+
+    for invalid in (b'[1,]', b'[1 2]', b'[1', b'[1] 2', b''):
+        with pytest.raises(ValueError):
+            run(json_stream(ChunkedBody(invalid)))
+
+    with pytest.raises(sanic.web.HTTPRequestEntityTooLarge):
+        run(hug.input_format.json_stream(max_body_size=4)(ChunkedBody(b'[1, 2, 3]', 2)))
+
+
+def test_json_stream_large_elements(run, monkeypatch):
+    """Ensure that elements spanning many chunks are only decoded once they have been received in full"""
+    decoded = []
+    raw_decode = hug.input_format.JSONDecoder.raw_decode
+
+    def counting_raw_decode(self, buffer, position=0):
+        decoded.append(position)
+        return raw_decode(self, buffer, position)
+    monkeypatch.setattr(hug.input_format.JSONDecoder, 'raw_decode', counting_raw_decode)
+
+    test_data = [{'text': 'a "quoted" [bracket} \\ ' * 50, 'nested': [[{'n': list(range(100))}]]}, '\\"]', 12345]
+    encoded = json.dumps(test_data).encode('utf8')
+    for chunk_size in (1, 2, 7, 64):
+        decoded.clear()
+        assert run(hug.input_format.json_stream()(ChunkedBody(encoded, chunk_size))) == test_data
+        assert len(decoded) == len(test_data)
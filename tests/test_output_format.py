@@ -0,0 +1,99 @@
+"""tests/test_output_format.py.
+
+Tests the output format handlers included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import json
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+import hug
+
+
+class NativeTypes(object):
+    def __native_types__(self):
+        return {'native': True}
+
+
+@pytest.mark.parametrize('encoder', sorted(hug.output_format.json_encoders))
+def test_json(encoder, monkeypatch):
+    """Ensure that every JSON encoding backend produces the same data"""
+    monkeypatch.setattr(hug.defaults, 'json_encoder', hug.output_format.json_encoders[encoder])
+    test_data = {'date': date(2016, 1, 2), 'datetime': datetime(2016, 1, 2, 3, 4, 5, 6), 'bytes': b'data',
+                 'binary': b'\xff\xfe', 'native': NativeTypes(), 'set': {1}, 'text': 'ü/text'}
+    assert json.loads(hug.output_format.json(test_data).decode('utf8')) == {
+        'date': '2016-01-02', 'datetime': '2016-01-02T03:04:05.000006', 'bytes': 'data', 'binary': '//4=',
+        'native': {'native': True}, 'set': [1], 'text': 'ü/text'}
+
+    Point = namedtuple('Point', ('x', 'y'))
+    assert json.loads(hug.output_format.json(Point(1, 2)).decode('utf8')) == {'x': 1, 'y': 2}
+    assert json.loads(hug.output_format.pretty_json([Point(1, 2)]).decode('utf8')) == [[1, 2]]
+    assert hug.output_format.json(Decimal('1.10')) == b'"1.10"'
+    assert json.loads(hug.output_format.json({'price': [Decimal('1.10'), Decimal('-0')]}).decode('utf8')) == {
+        'price': ['1.10', '-0']}
+
+    with pytest.raises(TypeError):
+        hug.output_format.json(object())
+
+
+@pytest.mark.skipif(not hug.output_format.orjson, reason='orjson is not installed')
+def test_json_backends_match():
+    """Ensure the orjson backend produces the same data as the stdlib for the content orjson handles differently"""
+    @dataclass
+    class Point(object):
+        x: int
+        y: int
+
+        def __native_types__(self):
+            return [self.x, self.y]
+
+    test_data = {'big': 2 ** 64, 'negative': -2 ** 63 - 1, 'point': Point(1, 2), 'nan': float('nan'),
+                 'infinity': float('inf'), 'negative_infinity': float('-inf'), 'none': None}
+    for content in (test_data, [Point(1, 2)], 2 ** 70, float('nan'), [None, 1.5]):
+        stdlib = json.loads(hug.output_format.json_encoders['json'](content).decode('utf8'))
+        assert repr(json.loads(hug.output_format.json_encoders['orjson'](content).decode('utf8'))) == repr(stdlib)
+
+
+def test_json_converter_dispatch():
+    """Ensure custom JSON converters are resolved through the MRO and re-resolved when a new one is registered"""
+    class Base(object):
+        pass
+
+    class Child(Base):
+        pass
+
+    hug.output_format.json_convert(Base)(lambda item: 'base')
+    assert hug.output_format.json([Base(), Child()]) == b'["base", "base"]'
+    assert Child in hug.output_format.json_converters_cache
+
+    hug.output_format.json_convert(Child)(lambda item: 'child')
+    assert Child not in hug.output_format.json_converters_cache
+    assert hug.output_format.json([Base(), Child()]) == b'["base", "child"]'
+
+
+def test_ndjson():
+    """Ensure newline delimited JSON renders every item on its own line, streamed without any extra framing"""
+    assert hug.output_format.ndjson({'name': 'value'}) == b'{"name": "value"}\n'
+    assert hug.output_format.ndjson.content_type == 'application/x-ndjson'
+    assert hug.output_format.ndjson.stream_framing == (b'', b'', b'')
+    assert hug.output_format.json.stream_framing == (b'[', b',', b']')
@@ -0,0 +1,81 @@
+"""tests/test_ranges.py.
+
+Tests the HTTP Range request handling included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+from collections import namedtuple
+
+import pytest
+
+import hug
+
+FakeStat = namedtuple('FakeStat', ('st_ino', 'st_size', 'st_mtime'))
+
+
+def test_parse():
+    """Ensure single, open-ended, suffix, and multiple byte ranges are parsed into inclusive positions"""
+    assert hug.ranges.parse('bytes=0-9', 100) == [(0, 9)]
+    assert hug.ranges.parse('bytes=90-', 100) == [(90, 99)]
+    assert hug.ranges.parse('bytes=-5', 100) == [(95, 99)]
+    assert hug.ranges.parse('bytes=-500', 100) == [(0, 99)]
+    assert hug.ranges.parse('bytes=95-500', 100) == [(95, 99)]
+    assert hug.ranges.parse('bytes=50-59, 0-9', 100) == [(0, 9), (50, 59)]
+    assert hug.ranges.parse('bytes=0-10,5-20,21-30', 100) == [(0, 30)]
+    assert hug.ranges.parse('bytes=0-9,200-300', 100) == [(0, 9)]
+
+
+def test_parse_ignored():
+    """Ensure malformed or excessive Range headers are ignored, so that the full representation is sent"""
+    assert hug.ranges.parse('items=0-9', 100) is None
+    assert hug.ranges.parse('bytes=9-0', 100) is None
+    assert hug.ranges.parse('bytes=-', 100) is None
+    assert hug.ranges.parse('bytes=a-b', 100) is None
+    assert hug.ranges.parse('bytes=' + ','.join(['0-1'] * 20), 100) is None
+
+
+def test_parse_not_satisfiable():
+    """Ensure ranges that don't overlap the representation are reported as not satisfiable"""
+    with pytest.raises(hug.ranges.RangeNotSatisfiable):
+        hug.ranges.parse('bytes=100-', 100)
+    with pytest.raises(hug.ranges.RangeNotSatisfiable):
+        hug.ranges.parse('bytes=-0', 100)
+    with pytest.raises(hug.ranges.RangeNotSatisfiable):
+        hug.ranges.parse('bytes=0-', 0)
+
+
+def test_if_range():
+    """Ensure If-Range only allows partial responses when the validator exactly matches the current one"""
+    stat = FakeStat(st_ino=1, st_size=100, st_mtime=1000000000.5)
+    entity_tag = hug.conditional.etag(stat)
+    assert hug.ranges.if_range(None, entity_tag, stat.st_mtime)
+    assert hug.ranges.if_range(entity_tag, entity_tag, stat.st_mtime)
+    assert not hug.ranges.if_range('"other"', entity_tag, stat.st_mtime)
+    assert not hug.ranges.if_range('W/' + entity_tag, entity_tag, stat.st_mtime)
+    assert hug.ranges.if_range(hug.conditional.http_date(stat.st_mtime), entity_tag, stat.st_mtime)
+    assert not hug.ranges.if_range(hug.conditional.http_date(0), entity_tag, stat.st_mtime)
+    assert not hug.ranges.if_range('not a date', entity_tag, stat.st_mtime)
+
+
+def test_multipart():
+    """Ensure multipart/byteranges bodies delimit every part with the boundary and its Content-Range"""
+    boundary, parts, closing = hug.ranges.multipart([(0, 1), (5, 9)], 10, 'video/mp4')
+    assert [(first, last) for header, first, last in parts] == [(0, 1), (5, 9)]
+    assert parts[1][0] == ('\r\n--{0}\r\nContent-Type: video/mp4\r\nContent-Range: bytes 5-9/10\r\n\r\n'
+                           .format(boundary).encode('ascii'))
+    assert closing == '\r\n--{0}--\r\n'.format(boundary).encode('ascii')
@@ -0,0 +1,81 @@
+"""tests/test_route_tree.py.
+
+Tests the compiled URL router included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import pytest
+import sanic
+
+import hug
+
+
+@pytest.fixture
+def tree():
+    tree = hug.route_tree.RouteTree()
+    tree.add('/users/<user_id:int>', 'GET', None, 'user_by_id')
+    tree.add('/users/<name>', 'GET', None, 'user_by_name')
+    tree.add('/users/me', 'GET', None, 'me')
+    tree.add('/users/me', 'POST', None, 'update_me')
+    tree.add('/prices/{price:float}', 'GET', None, 'price')
+    tree.add('/files/<rest:path>', 'GET', None, 'files')
+    tree.add('/versioned', 'GET', 1, 'first')
+    tree.add('/versioned', 'GET', 2, 'second')
+    tree.add('/', 'GET', None, 'root')
+    return tree
+
+
+def test_match(tree):
+    """Ensure static segments are preferred over typed parameters, which are preferred over untyped ones"""
+    assert tree.resolve('GET', '/users/me') == ('me', None, {})
+    assert tree.resolve('POST', '/users/me/') == ('update_me', None, {})
+    assert tree.resolve('GET', '/users/10') == ('user_by_id', None, {'user_id': 10})
+    assert tree.resolve('GET', '/users/timothy') == ('user_by_name', None, {'name': 'timothy'})
+    assert tree.resolve('GET', '/prices/1.5') == ('price', None, {'price': 1.5})
+    assert tree.resolve('GET', '/prices/free') is None
+    assert tree.resolve('GET', '/files/docs/index.html') == ('files', None, {'rest': 'docs/index.html'})
+    assert tree.resolve('GET', '/') == ('root', None, {})
+    assert tree.resolve('GET', '/missing') is None
+
+    with pytest.raises(sanic.web.HTTPMethodNotAllowed):
+        tree.resolve('DELETE', '/users/me')
+
+
+def test_versions(tree):
+    """Ensure a leading /vN segment selects the version, falling back to an unversioned handler"""
+    assert tree.resolve('GET', '/v1/versioned') == ('first', 1, {})
+    assert tree.resolve('GET', '/v2/versioned') == ('second', 2, {})
+    assert tree.resolve('GET', '/versioned') is None
+    assert tree.resolve('GET', '/v2/users/me') == ('me', 2, {})
+    assert tree.resolve('GET', '/v3/versioned') is None
+
+    assert tree.resolve('GET', '/versioned', 2) == ('second', 2, {})
+    assert tree.resolve('GET', '/v2/versioned', 2) == ('second', 2, {})
+    assert tree.resolve('GET', '/versioned', 3) is None
+    assert tree.resolve('GET', '/users/me', 3) == ('me', None, {})
+    with pytest.raises(sanic.web.HTTPBadRequest):
+        tree.resolve('GET', '/v1/versioned', 2)
+
+
+def test_invalid_urls():
+    """Ensure URLs the tree can't route are rejected as they are added"""
+    tree = hug.route_tree.RouteTree()
+    with pytest.raises(ValueError):
+        tree.add('/files/<rest:path>/edit', 'GET', None, 'handler')
+    with pytest.raises(ValueError):
+        tree.add('/users/<user_id:uuid>', 'GET', None, 'handler')
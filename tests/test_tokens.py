@@ -0,0 +1,120 @@
+"""tests/test_tokens.py.
+
+Tests the signed tokens included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import time
+
+import pytest
+
+import hug
+from hug.exceptions import InvalidToken
+
+# Signed with the key "your-256-bit-secret", as found on https://jwt.io
+JWT_IO_TOKEN = ('eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiIxMjM0NTY3ODkwIiwibmFtZSI6IkpvaG4gRG9lIiwiaWF0IjoxNTE2'
+                'MjM5MDIyfQ.SflKxwRJSMeKKF2QT4fwpMeJf36POk6yJV_adQssw5c')
+
+
+def test_key_set():
+    """Test to ensure tokens are signed and verified, including tokens issued by other implementations"""
+    assert hug.tokens.KeySet('your-256-bit-secret').verify(JWT_IO_TOKEN) == \
+        {'sub': '1234567890', 'name': 'John Doe', 'iat': 1516239022}
+
+    key_set = hug.tokens.KeySet('secret')
+    claims = {'sub': '1234567890', 'name': 'John Doe', 'iat': 1516239022}
+    assert key_set.verify(key_set.sign(claims)) == claims
+
+    token = key_set.sign({'user': 'Tim', 'exp': time.time() + 60})
+    assert key_set.verify(token)['user'] == 'Tim'
+    with pytest.raises(InvalidToken):
+        key_set.verify(token[:-2])
+    with pytest.raises(InvalidToken):
+        key_set.verify('not.a.token')
+    with pytest.raises(InvalidToken):
+        hug.tokens.KeySet('other secret').verify(token)
+    with pytest.raises(InvalidToken):
+        key_set.verify(key_set.sign({'user': 'Tim', 'exp': time.time() - 1}))
+    with pytest.raises(InvalidToken):
+        key_set.verify(key_set.sign({'user': 'Tim', 'nbf': time.time() + 60}))
+    with pytest.raises(InvalidToken):
+        key_set.verify(key_set.sign({'user': 'Tim', 'exp': 'tomorrow'}))
+    assert hug.tokens.KeySet('secret', algorithm='HS512').verify(token)['user'] == 'Tim'
+
+
+def test_key_rotation():
+    """Test to ensure tokens signed with an older key of a set still verify after it's rotated"""
+    key_set = hug.tokens.KeySet({'2016-01': 'old secret'})
+    old_token = key_set.sign({'user': 'Tim'})
+    key_set.update({'2016-01': 'old secret', '2016-02': 'new secret'})
+    assert key_set.current == '2016-02'
+    new_token = key_set.sign({'user': 'Tim'})
+    assert key_set.verify(old_token) == key_set.verify(new_token) == {'user': 'Tim'}
+
+    key_set.update({'2016-02': 'new secret'})
+    with pytest.raises(InvalidToken):
+        key_set.verify(old_token)
+
+
+def test_file_key_set(tmpdir):
+    """Test to ensure key sets can be loaded from, and rotated through, a directory of key files"""
+    tmpdir.join('first').write('first secret\n')
+    key_set = hug.tokens.FileKeySet(str(tmpdir), check_interval=0)
+    assert key_set.keys == {'first': b'first secret'}
+    first_token = key_set.sign({'user': 'Tim'})
+
+    tmpdir.join('second').write('second secret')
+    tmpdir.join('current').write('second')
+    key_set.refresh()
+    assert key_set.current == 'second'
+    assert key_set.verify(first_token) == {'user': 'Tim'}
+    assert key_set.verify(key_set.sign({'user': 'Tim'})) == {'user': 'Tim'}
+
+
+def test_verifier():
+    """Test to ensure verified tokens are remembered until they expire, and forgotten once the keys change"""
+    key_set = hug.tokens.KeySet({'first': 'secret'})
+    verifier = hug.tokens.Verifier(key_set, max_age=60)
+    token = key_set.sign({'user': 'Tim', 'exp': time.time() + 0.05})
+
+    claims = verifier('Bearer ' + token)
+    assert claims == {'user': 'Tim', 'exp': claims['exp']}
+    assert verifier(token) is claims
+    assert verifier('Bearer invalid') is None
+
+    time.sleep(0.06)
+    assert verifier(token) is None
+
+    token = key_set.sign({'user': 'Tim'})
+    assert verifier(token) == {'user': 'Tim'}
+    key_set.update({'second': 'other secret'})
+    assert verifier(token) is None
+
+
+def test_default_key_set(monkeypatch):
+    """Test to ensure the TOKEN_SECRET_KEY setting is read from settings.yaml or the environment"""
+    monkeypatch.delitem(hug.tokens.config, 'TOKEN_SECRET_KEY', raising=False)
+    monkeypatch.delenv('TOKEN_SECRET_KEY', raising=False)
+    with pytest.raises(ValueError):
+        hug.tokens.default_key_set()
+
+    monkeypatch.setenv('TOKEN_SECRET_KEY', 'your-256-bit-secret')
+    assert hug.tokens.Verifier()(JWT_IO_TOKEN)['name'] == 'John Doe'
+
+    monkeypatch.setitem(hug.tokens.config, 'TOKEN_SECRET_KEY', 'secret')
+    assert hug.tokens.default_key_set().keys == hug.tokens.KeySet('secret').keys
@@ -0,0 +1,252 @@
+"""tests/test_types.py.
+
+Tests the type validators included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import pytest
+
+import hug
+from hug.exceptions import InvalidTypeData
+
+
+def test_number():
+    """Test to ensure the whole number type converts single values, and whole lists of them at once"""
+    assert hug.types.number('1') == 1
+    assert hug.types.number.batch(['1', '2', '3']) == [1, 2, 3]
+    with pytest.raises(ValueError):
+        hug.types.number('bacon')
+    with pytest.raises(InvalidTypeData) as error:
+        hug.types.number.batch(['1', 'bacon', '3', 'eggs'])
+    assert error.value.reasons == {1: 'Invalid whole number provided', 3: 'Invalid whole number provided'}
+
+
+def test_multiple():
+    """Test to ensure multiple values can be converted, as a batch, using the type they are of"""
+    assert hug.types.multiple('value') == ['value']
+    assert hug.types.multiple(['value1', 'value2']) == ['value1', 'value2']
+    assert hug.types.Multiple(hug.types.number)(['1', '2']) == [1, 2]
+    assert hug.types.Multiple(hug.types.number)('1') == [1]
+    assert hug.types.Multiple(hug.types.smart_boolean)(['true', 'f']) == [True, False]
+    with pytest.raises(InvalidTypeData) as error:
+        hug.types.Multiple(hug.types.smart_boolean)(['true', 'maybe'])
+    assert list(error.value.reasons) == [1]
+
+
+def test_delimited_list():
+    """Test to ensure delimited lists can be converted, as a batch, using the type they are of"""
+    assert hug.types.comma_separated_list('value1,value2') == ['value1', 'value2']
+    assert hug.types.DelimitedList(using='|', of=hug.types.float_number)('1.5|2') == [1.5, 2.0]
+
+    in_range = hug.types.DelimitedList(of=hug.types.InRange(1, 10))
+    assert in_range(','.join(str(value) for value in range(1, 10))) == list(range(1, 10))
+    with pytest.raises(InvalidTypeData) as error:
+        in_range('1,10,bacon,0')
+    assert error.value.reasons == {1: "'10' reaches the limit of 10", 2: 'Invalid whole number provided',
+                                   3: "'0' is less than the lower limit 1"}
+
+
+def test_bounded_batches():
+    """Test to ensure bounded number types check whole batches against their limits"""
+    assert hug.types.LessThan(5).batch(['1', '4']) == [1, 4]
+    assert hug.types.GreaterThan(0).batch(['1', '4']) == [1, 4]
+    assert hug.types.InRange(0, 5).batch([]) == []
+    with pytest.raises(InvalidTypeData) as error:
+        hug.types.LessThan(5).batch(['1', '5'])
+    assert error.value.reasons == {1: "'5' must be less than 5"}
+    with pytest.raises(InvalidTypeData) as error:
+        hug.types.GreaterThan(0).batch(['0', '4'])
+    assert error.value.reasons == {0: "'0' must be greater than 0"}
+
+
+def test_chain_batches():
+    """Test to ensure chained and nullable types convert whole batches"""
+    positive = hug.types.Chain(hug.types.number, hug.types.GreaterThan(0))
+    assert positive.batch(['1', '2']) == [1, 2]
+    with pytest.raises(InvalidTypeData) as error:
+        positive.batch(['1', 'bacon', '-1'])
+    assert list(error.value.reasons) == [1, 2]
+    assert hug.types.Nullable(hug.types.number).batch([None, '2']) == [None, 2]
+
+
+@pytest.mark.skipif(hug.types.numpy is None, reason='numpy is not installed')
+def test_array_batches():
+    """Test to ensure numeric batches can be converted into NumPy arrays"""
+    ids = hug.types.DelimitedList(of=hug.types.InRange(0, 100), array=True)('1,2,3')
+    assert isinstance(ids, hug.types.numpy.ndarray)
+    assert ids.tolist() == [1, 2, 3]
+    with pytest.raises(InvalidTypeData) as error:
+        hug.types.DelimitedList(of=hug.types.InRange(0, 100), array=True)('1,200,3')
+    assert list(error.value.reasons) == [1]
+
+
+def test_schema():
+    """Test to ensure schemas validate every field at once, reporting all of the fields that are invalid"""
+    class User(hug.types.Schema):
+        name = hug.types.text
+        age = hug.types.InRange(0, 150)
+
+    class Admin(User):
+        level = hug.types.number
+
+    user = User({'name': 'Timothy', 'age': '30', 'nickname': 'tim'})
+    assert (user.name, user.age, user.nickname) == ('Timothy', 30, 'tim')
+    assert User(user) is user
+
+    user.age = '31'
+    assert user.age == 31
+    with pytest.raises(ValueError):
+        user.age = '200'
+
+    with pytest.raises(InvalidTypeData) as error:
+        User({'name': ['not', 'text'], 'age': '200'})
+    assert error.value.message == 'Invalid User passed in'
+    assert set(error.value.reasons) == {'name', 'age'}
+
+    admin = Admin({'name': 'Timothy', 'age': '30', 'level': '2'})
+    assert (admin.name, admin.age, admin.level) == ('Timothy', 30, 2)
+    with pytest.raises(InvalidTypeData) as error:
+        Admin({'age': 'old', 'level': 'high'})
+    assert set(error.value.reasons) == {'age', 'level'}
+
+    forced = User({'age': 'unchecked'}, force=True)
+    assert forced.age == 'unchecked'
+
+
+def test_schema_custom_init():
+    """Test to ensure schemas defining their own __init__, or slots, keep the behaviour of the generic one"""
+    class Audited(hug.types.Schema):
+        name = hug.types.text
+
+        def __init__(self, json, force=False):
+            super().__init__(json, force)
+            self.audited = True
+
+    class AuditedUser(Audited):
+        age = hug.types.number
+
+    user = AuditedUser({'name': 'Timothy', 'age': '30'})
+    assert (user.name, user.age, user.audited) == ('Timothy', 30, True)
+    assert AuditedUser.__init__ is Audited.__init__
+
+    class Slotted(hug.types.Schema):
+        __slots__ = ('_name', )
+        name = hug.types.text
+
+    class SlottedUser(Slotted):
+        __slots__ = ('_age', )
+        age = hug.types.number
+
+    user = SlottedUser({'name': 'Timothy', 'age': '30'})
+    assert (user.name, user.age) == ('Timothy', 30)
+    assert not hasattr(user, '__dict__')
+
+
+def test_memoize():
+    """Test to ensure pure types can be memoized, counting how often remembered results are reused"""
+    assert hug.types.memoize(hug.types.multiple) is hug.types.multiple
+
+    status = hug.types.OneOf(('active', 'inactive'))
+    memoized = hug.types.memoize(status, max_entries=2)
+    assert isinstance(memoized, hug.types.Memoized)
+    assert hug.types.memoize(status) is memoized
+    assert memoized.__doc__ == status.__doc__
+
+    assert memoized('active') == 'active'
+    assert memoized('active') == 'active'
+    assert (memoized.hits, memoized.misses) == (1, 1)
+    with pytest.raises(KeyError):
+        memoized('deleted')
+    assert len(memoized.results) == 1
+
+    number = hug.types.Memoized(hug.types.number)
+    assert number('1') == 1 and number(1) == 1 and number(True) == 1
+    assert (number.hits, number.misses) == (0, 3)
+    number.clear()
+    assert (number.hits, number.misses, len(number.results)) == (0, 0, 0)
+
+    unhashable = hug.types.Memoized(hug.types.text)
+    with pytest.raises(ValueError):
+        unhashable(['not', 'text'])
+    assert unhashable.misses == 0
+
+
+def test_one_of():
+    """Test to ensure one of types accept only their values, checking them without scanning through every value"""
+    codes = hug.types.OneOf(['code{0}'.format(index) for index in range(50000)])
+    assert isinstance(codes.accepted, frozenset)
+    assert codes('code49999') == 'code49999'
+    with pytest.raises(KeyError):
+        codes('code50000')
+    with pytest.raises(KeyError):
+        codes(['code1'])
+
+    status = hug.types.OneOf(('active', 'inactive'))
+    assert status.__doc__ == 'Accepts one of the following values: (active|inactive)'
+    with pytest.raises(KeyError) as error:
+        status('deleted')
+    assert error.value.args[0] == 'Invalid value passed. The accepted values are: (active|inactive)'
+    assert hug.types.OneOf((1, 2)).__doc__ == 'Accepts one of the following values: (1|2)'
+
+
+def test_mapping():
+    """Test to ensure mapping types translate their accepted values, rejecting any others"""
+    value_map = {'on': True, 'off': False}
+    switch = hug.types.Mapping(value_map)
+    value_map['maybe'] = None
+    assert switch('on') is True
+    assert switch('off') is False
+    assert switch.__doc__ == 'Accepts one of the following values: (on|off)'
+    with pytest.raises(KeyError):
+        switch('maybe')
+    with pytest.raises(KeyError):
+        switch(['on'])
+
+
+def test_multi():
+    """Test to ensure multi types skip the types a value can't be meant for, and report every error otherwise"""
+    identifier = hug.types.Multi(hug.types.uuid, hug.types.number)
+    assert identifier('10') == 10
+    assert identifier('6a2f41a3-c54c-fce8-32d2-0324e1c32e22') == \
+        hug.types.uuid('6a2f41a3-c54c-fce8-32d2-0324e1c32e22')
+    with pytest.raises(InvalidTypeData) as error:
+        identifier('bacon')
+    assert error.value.reasons == ['Invalid UUID provided', 'Invalid whole number provided']
+
+    calls = []
+
+    def counted(type_method):
+        def convert(value):
+            calls.append(type_method)
+            return type_method(value)
+        convert.__doc__ = type_method.__doc__
+        return convert
+
+    with pytest.raises(InvalidTypeData) as error:
+        hug.types.Multi(counted(hug.types.uuid), counted(hug.types.number))('bacon')
+    assert error.value.reasons == ['Invalid UUID provided', 'Invalid whole number provided']
+    assert calls == [hug.types.uuid, hug.types.number]
+
+    assert not hug.types.number.accepts('bacon')
+    assert hug.types.number.accepts(' -1_000 ')
+    assert hug.types.number.accepts(1.5)
+    assert not hug.types.uuid.accepts('10')
+    assert hug.types.OneOf(('a', 'b')).accepts('a')
+    assert not hug.types.OneOf(('a', 'b')).accepts(['a'])
+    assert not hug.types.text.accepts(None)
+    assert hug.types.float_number.accepts('anything')
@@ -0,0 +1,153 @@
+"""tests/test_use.py.
+
+Tests the service consumption helpers included with Hug
+
+Copyright (C) 2016 Timothy Edmund Crosley
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+import asyncio
+import time
+
+import pytest
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import hug
+
+
+def test_async_http(run):
+    """Test to ensure async HTTP services call endpoints over pooled connections, without blocking"""
+    async def echo(request):
+        return web.json_response({'method': request.method, 'query': dict(request.query),
+                                  'body': await request.json() if request.can_read_body else None,
+                                  'auth': request.headers.get('Authorization')})
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return web.json_response({})
+
+    async def failing(request):
+        return web.Response(status=500, text='Failed')
+
+    async def text(request):
+        return web.Response(body=b'\x00binary', content_type='application/octet-stream')
+
+    async def call():
+        app = web.Application()
+        app.router.add_route('*', '/echo/{name}', echo)
+        app.router.add_get('/slow', slow)
+        app.router.add_get('/failing', failing)
+        app.router.add_get('/binary', text)
+        async with TestServer(app) as server:
+            url = str(server.make_url(''))
+            async with hug.use.AsyncHTTP(url, auth=('Tim', 'password'), limit_per_host=2) as service:
+                responses = await asyncio.gather(*(service.post('/echo/{0}'.format(index), value=index)
+                                                   for index in range(4)))
+                assert [response.data['body'] for response in responses] == [{'value': index} for index in range(4)]
+                assert responses[0].status_code == 200
+                assert responses[0].data['auth'].startswith('Basic ')
+                assert responses[0].headers['Content-Type'].startswith('application/json')
+
+                response = await service.request('GET', '/echo/{name}', url_params={'name': 'Tim'})
+                assert response.data['method'] == 'GET'
+
+                binary = await service.get('/binary')
+                assert binary.data.read() == b'\x00binary'
+
+                with pytest.raises(requests.HTTPError):
+                    await service.get('/failing')
+                with pytest.raises(asyncio.TimeoutError):
+                    await service.get('/slow', timeout=0.05)
+
+            query_service = hug.use.AsyncHTTP(url, json_transport=False, timeout=0.05)
+            assert (await query_service.get('/echo/query', value='1')).data['query'] == {'value': '1'}
+            with pytest.raises(asyncio.TimeoutError):
+                await query_service.get('/slow')
+            await query_service.close()
+
+    run(call())
+
+
+def test_local(hug_api, run):
+    """Test to ensure hug endpoints can be called locally, as if they were a remote service"""
+    @hug_api.route.http.get()
+    async def add(first: hug.types.number, second: hug.types.number):
+        return {'sum': first + second}
+
+    service = hug.use.Local(hug_api)
+    response = service.get('add', first='1', second='2')
+    assert response.status_code == 200
+    assert response.data == {'sum': 3}
+
+    response = service.get('add', first='one', second='2')
+    assert response.status_code == 400
+    assert 'first' in response.data['errors']
+    assert service.get('missing').status_code == 404
+
+    async def from_coroutine():
+        with pytest.raises(RuntimeError):
+            service.get('add', first='1', second='2')
+        return ((await service.async_request('GET', 'add', first='1', second='2')).data,
+                (await service.async_request('GET', 'missing')))
+    data, missing = run(from_coroutine())
+    assert data == {'sum': 3}
+    assert missing.status_code == 404
+
+
+def test_gather(hug_api, run):
+    """Test to ensure services can make many requests concurrently, keeping whatever completes by the deadline"""
+    @hug_api.route.http.get()
+    async def wait(seconds: hug.types.float_number):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    service = hug.use.Local(hug_api, raise_on=(400, ))
+
+    async def gather():
+        started = asyncio.get_event_loop().time()
+        results = await service.gather([{'method': 'GET', 'url': 'wait', 'seconds': seconds}
+                                        for seconds in (0.03, 0.01, 0.02)], concurrency=3)
+        assert asyncio.get_event_loop().time() - started < 0.055
+        assert [result.data for result in results] == [0.03, 0.01, 0.02]
+
+        results = await service.gather([('GET', 'wait', {'seconds': 0.01}), ('GET', 'wait', {'seconds': 'x'}),
+                                        {'method': 'GET', 'url': 'wait', 'seconds': 1}], deadline=0.1)
+        assert results[0].data == 0.01
+        assert isinstance(results[1], requests.HTTPError)
+        assert isinstance(results[2], asyncio.TimeoutError)
+        assert await service.gather([]) == []
+    run(gather())
+
+
+def test_gather_blocking(run):
+    """Test to ensure services whose requests block are called concurrently from the executor"""
+    class Blocking(hug.use.Service):
+        def request(self, method, url, url_params=hug._empty.dict, headers=hug._empty.dict, timeout=None, **params):
+            time.sleep(params['seconds'])
+            return hug.use.Response(url, 200, {})
+
+    async def gather():
+        started = asyncio.get_event_loop().time()
+        results = await Blocking().gather([{'method': 'GET', 'url': str(index), 'seconds': 0.05}
+                                           for index in range(4)], concurrency=4)
+        assert asyncio.get_event_loop().time() - started < 0.15
+        assert [result.data for result in results] == ['0', '1', '2', '3']
+
+        results = await Blocking().gather([{'method': 'GET', 'url': 'slow', 'seconds': 0.2}], deadline=0.01)
+        assert isinstance(results[0], asyncio.TimeoutError)
+    run(gather())